@@ -0,0 +1,157 @@
+import argparse
+import multiprocessing
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from snapshot import build_snapshot, has_snapshot
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Times load_data, name resolution and point-to-point queries on a dataset
+# folder (see generate.py for synthetic ones). Every loading mode runs in a
+# fresh process, so its peak memory is measured on its own. Queries connect
+# people of the largest connected component, so they find a path (should
+# one not, it is timed apart).
+
+LOAD_MODES = {
+    "dict": {"compact": False},
+    "compact": {"compact": True, "use_snapshot": False},
+    "snapshot": {"compact": True, "use_snapshot": True},
+}
+
+
+def peak_memory_mb():
+    """Returns the peak resident memory of this process in MB, or None if unknown."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(function, *args, **kwargs):
+    """Returns (result, seconds) of one call."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def timed_query(degrees, source, target, method):
+    """Returns (whether a path was found, seconds) of one shortest_path query."""
+    start = time.perf_counter()
+    found = degrees.shortest_path(source, target, method) is not None
+    return found, time.perf_counter() - start
+
+
+def largest_component(degrees):
+    """Returns the list of person_ids of the largest group of connected people."""
+    seen = set()
+    largest = []
+    for person_id in degrees.people:
+        if person_id in seen:
+            continue
+        seen.add(person_id)
+        component = [person_id]
+        for member in component:
+            for _, neighbor in degrees.neighbors_for_person(member):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    component.append(neighbor)
+        if len(component) > len(largest):
+            largest = component
+    return largest
+
+
+def run_mode(directory, mode, methods, n_queries, n_names, seed):
+    """
+    Loads directory in the given mode and returns a dict of timings in seconds.
+    """
+    import degrees
+
+    # without a snapshot load_data would quietly parse the CSVs instead
+    if mode == "snapshot" and not has_snapshot(directory):
+        raise RuntimeError(f"no up to date snapshot in {directory}")
+
+    report = {"mode": mode}
+    _, report["load"] = timed(degrees.load_data, directory, **LOAD_MODES[mode])
+    report["load_memory_mb"] = peak_memory_mb()
+
+    rng = random.Random(seed)
+    person_ids = list(degrees.people)
+
+    # name resolution, exact and with one typo (after building the fuzzy index)
+    sample = [degrees.people[rng.choice(person_ids)]["name"] for _ in range(n_names)]
+    _, elapsed = timed(lambda: [degrees.person_id_for_name(name, policy="most_movies")
+                                for name in sample])
+    report["name_exact"] = elapsed / n_names
+    _, report["fuzzy_index"] = timed(degrees.name_index.build)
+    typos = [name[:-1] for name in sample]
+    _, elapsed = timed(lambda: [degrees.person_id_for_name(name, policy="most_movies", fuzzy=True)
+                                for name in typos])
+    report["name_fuzzy"] = elapsed / n_names
+
+    # the same random pairs for every search method, from the largest component
+    # (random people are mostly unconnected, and such queries end instantly)
+    component = largest_component(degrees)
+    pairs = [(rng.choice(component), rng.choice(component)) for _ in range(n_queries)]
+    for method in methods:
+        if method == "alt" and degrees.landmark_tables is None:
+            continue
+        found, missing = [], []
+        for source, target in pairs:
+            connected, elapsed = timed_query(degrees, source, target, method)
+            (found if connected else missing).append(elapsed)
+        report[method] = (statistics.median(found), max(found)) if found else None
+        report[f"{method}_missing"] = (len(missing), statistics.median(missing)) if missing else None
+
+    report["peak_memory_mb"] = peak_memory_mb()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", type=str, help="dataset folder to benchmark")
+    parser.add_argument("--modes", type=str, nargs="+", choices=list(LOAD_MODES), default=list(LOAD_MODES))
+    parser.add_argument("--methods", type=str, nargs="+", choices=["bfs", "dfs", "bibfs", "alt"], default=["bfs", "bibfs", "alt"])
+    parser.add_argument("-q", type=int, help="number of queries per method", default=20)
+    parser.add_argument("--names", type=int, help="number of name lookups", default=1000)
+    parser.add_argument("--seed", type=int, help="random seed for the sampled queries", default=0)
+    args = parser.parse_args()
+
+    # a fresh interpreter per mode keeps peak memory numbers apart
+    context = multiprocessing.get_context("spawn")
+
+    if "snapshot" in args.modes and not has_snapshot(args.directory):
+        print(f"Writing snapshot of {args.directory}...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            pool.submit(build_snapshot, args.directory).result()
+
+    for mode in args.modes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            report = pool.submit(run_mode, args.directory, mode, args.methods,
+                                 args.q, args.names, args.seed).result()
+
+        print(f"{mode}:")
+        print(f"  load_data        {report['load']:10.3f} s")
+        print(f"  name (exact)     {report['name_exact'] * 1000:10.3f} ms")
+        print(f"  fuzzy index      {report['fuzzy_index']:10.3f} s")
+        print(f"  name (fuzzy)     {report['name_fuzzy'] * 1000:10.3f} ms")
+        for method in args.methods:
+            if method not in report:
+                continue
+            if report[method] is not None:
+                median, longest = report[method]
+                print(f"  {method:<6} median   {median * 1000:10.3f} ms   (max {longest * 1000:.3f} ms)")
+            if report[f"{method}_missing"] is not None:
+                count, median = report[f"{method}_missing"]
+                print(f"  {method:<6} no path  {median * 1000:10.3f} ms   ({count} of {args.q} queries)")
+        if report["peak_memory_mb"] is not None:
+            print(f"  memory after load {report['load_memory_mb']:9.1f} MB")
+            print(f"  peak memory      {report['peak_memory_mb']:10.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
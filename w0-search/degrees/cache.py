@@ -0,0 +1,163 @@
+import threading
+from collections import OrderedDict
+
+# search methods whose results are shortest paths, so any BFS tree can answer them
+SHORTEST_METHODS = {"bfs", "bibfs", "alt"}
+
+# sources whose query counts are remembered, least recently queried forgotten first
+SOURCE_LIMIT = 100_000
+
+# query count of a source whose tree is too big to cache
+TOO_BIG = -1
+
+
+class PathCache():
+    """
+    Bounded LRU cache for shortest_path.
+
+    Stores finished paths per (source, target, method) and, for sources
+    queried at least tree_after times, the whole BFS parent tree rooted at
+    the source, so every later query from that source is a walk up the tree.
+
+    Size is bounded in stored people: a path costs its length + 1,
+    a tree the number of people it reaches. Least recently used entries
+    are evicted once max_cost is exceeded. A tree may take at most a
+    quarter of max_cost: sources whose component is bigger are noticed
+    by one cut-short BFS and then keep caching single paths.
+    """
+
+    def __init__(self, neighbors, max_cost=1_000_000, tree_after=2):
+        self.neighbors = neighbors
+        self.max_cost = max_cost
+        self.tree_after = tree_after
+        self.max_tree_cost = max_cost // 4
+        # guards entries, costs, cost, source_counts and the statistics,
+        # as server.py shares one cache between request threads
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.costs = {}
+        self.cost = 0
+        # source -> shortest path queries that missed, or TOO_BIG
+        self.source_counts = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def shortest_path(self, source, target, search_method, search):
+        """
+        Returns the path from source to target, asking search(source, target,
+        search_method) only when the cache can't answer.
+        """
+        shortest = search_method in SHORTEST_METHODS and source != target
+
+        key = ("path", source, target, search_method)
+        # searches run outside the lock, stored trees are never modified
+        with self.lock:
+            # a cached tree from the source answers any shortest path query
+            tree = self.entries.get(("tree", source)) if shortest else None
+            if tree is not None:
+                self.hits += 1
+                self.entries.move_to_end(("tree", source))
+            elif key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            else:
+                self.misses += 1
+                hot = shortest and self.count_source(source) >= self.tree_after
+        if tree is not None:
+            return walk_tree(tree, target)
+
+        # hot sources get a full tree instead of single paths
+        if hot:
+            tree = self.build_tree(source, self.max_tree_cost)
+            with self.lock:
+                if tree is not None:
+                    self.store(("tree", source), tree, len(tree))
+                elif source in self.source_counts:
+                    self.source_counts[source] = TOO_BIG
+            if tree is not None:
+                return walk_tree(tree, target)
+
+        path = search(source, target, search_method)
+        with self.lock:
+            self.store(key, path, 1 + (len(path) if path else 0))
+        return path
+
+    def count_source(self, source):
+        """
+        Counts a missed shortest path query from source and returns its
+        count so far (TOO_BIG once its tree didn't fit). Call with the lock held.
+        """
+        count = self.source_counts.pop(source, 0)
+        if count != TOO_BIG:
+            count += 1
+        self.source_counts[source] = count
+        if len(self.source_counts) > SOURCE_LIMIT:
+            self.source_counts.popitem(last=False)
+        return count
+
+    def build_tree(self, source, limit):
+        """
+        Returns the BFS parent tree rooted at source:
+        person_id -> (movie_id, parent person_id), None for the source.
+        Returns None as soon as the tree reaches more than limit people.
+        """
+        tree = {source: None}
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for person_id in frontier:
+                for movie_id, neighbor_id in self.neighbors(person_id):
+                    if neighbor_id not in tree:
+                        tree[neighbor_id] = (movie_id, person_id)
+                        next_frontier.append(neighbor_id)
+                        if len(tree) > limit:
+                            return None
+            frontier = next_frontier
+        return tree
+
+    def store(self, key, value, cost):
+        """Adds an entry, evicting old ones. Call with the lock held."""
+        if cost > self.max_cost:
+            return
+        if key in self.entries:
+            del self.entries[key]
+            self.cost -= self.costs.pop(key)
+        self.entries[key] = value
+        self.cost += cost
+        self.costs[key] = cost
+        while self.cost > self.max_cost:
+            evicted, _ = self.entries.popitem(last=False)
+            self.cost -= self.costs.pop(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.costs.clear()
+            self.source_counts.clear()
+            self.cost = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.entries),
+                "cost": self.cost
+            }
+
+
+def walk_tree(tree, target):
+    """
+    Returns the (movie_id, person_id) path from the tree's root to target,
+    or None if the target isn't in the tree.
+    """
+    if target not in tree:
+        return None
+    path = []
+    while tree[target] is not None:
+        movie_id, parent_id = tree[target]
+        path.append((movie_id, target))
+        target = parent_id
+    path.reverse()
+    return path
@@ -2,6 +2,12 @@ import csv
 import sys
 import argparse
 from util import Node, QueueFrontier, StackFrontier
+from cache import PathCache
+from graph import CompactGraph
+from landmarks import read_landmarks
+from nameindex import NameIndex
+from paths import all_shortest_paths, k_shortest_paths
+from snapshot import is_fresh, read_snapshot
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,20 +18,54 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# CompactGraph holding the stars when loaded with compact=True, else None
+graph = None
 
-def load_data(directory):
+# PathCache answering repeated queries, see enable_cache
+cache = None
+
+# NameIndex over names, built by load_data
+name_index = None
+
+# Landmarks distance tables for the "alt" search, see landmarks.py
+landmark_tables = None
+
+# ways person_id_for_name can resolve a name shared by several people
+POLICIES = ["ask", "most_movies", "all"]
+
+
+def load_data(directory, compact=False, use_snapshot=True):
     """
     Load data from CSV files into memory.
+
+    With compact=True the stars are stored in an integer-indexed CSR graph
+    instead of the "movies" and "stars" sets of people and movies, and a
+    binary snapshot (see snapshot.py) newer than the CSVs is loaded instead.
     """
+    global graph
+
+    # use the memory-mapped snapshot if it is up to date
+    if compact and use_snapshot and is_fresh(directory):
+        loaded = read_snapshot(directory)
+        if loaded is not None:
+            snapshot_people, snapshot_movies, graph = loaded
+            people.update(snapshot_people)
+            movies.update(snapshot_movies)
+            for person_id, person in people.items():
+                names.setdefault(person["name"].lower(), set()).add(person_id)
+            build_indexes(directory)
+            return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             people[row["id"]] = {
                 "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
+                "birth": row["birth"]
             }
+            if not compact:
+                people[row["id"]]["movies"] = set()
             if row["name"].lower() not in names:
                 names[row["name"].lower()] = {row["id"]} # this creates a set because of {}
             else:
@@ -37,25 +77,45 @@ def load_data(directory):
         for row in reader:
             movies[row["id"]] = {
                 "title": row["title"],
-                "year": row["year"],
-                "stars": set()
+                "year": row["year"]
             }
+            if not compact:
+                movies[row["id"]]["stars"] = set()
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+        if compact:
+            stars = ((row["person_id"], row["movie_id"]) for row in reader)
+            graph = CompactGraph.from_stars(people.keys(), movies.keys(), stars)
+        else:
+            for row in reader:
+                try:
+                    people[row["person_id"]]["movies"].add(row["movie_id"])
+                    movies[row["movie_id"]]["stars"].add(row["person_id"])
+                except KeyError:
+                    pass
+
+    build_indexes(directory)
+
+
+def build_indexes(directory):
+    """
+    Builds the name index and loads the landmark tables persisted with the dataset.
+    """
+    global name_index, landmark_tables
+    name_index = NameIndex(names, movie_count)
+    landmark_tables = read_landmarks(directory, people)
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("-d", type=str, help="dataset folder to load", choices=["small", "large"], default="small")
-    parser.add_argument("-m", type=str, help="bfs or dfs search method", choices=["bfs", "dfs"], default="bfs")
+    parser.add_argument("-m", type=str, help="bfs, dfs, bibfs (bidirectional bfs) or alt (A* with landmarks) search method", choices=["bfs", "dfs", "bibfs", "alt"], default="bfs")
+    parser.add_argument("-c", help="store the stars in a compact integer-indexed graph", action="store_true")
+    parser.add_argument("-p", type=str, help="how to pick between people with the same name", choices=POLICIES[:2], default="ask")
+    parser.add_argument("-f", help="tolerate typos in names", action="store_true")
+    parser.add_argument("-k", type=int, help="list the k shortest paths instead of one", default=None)
     args = parser.parse_args()
 
     directory = args.d
@@ -63,29 +123,50 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, compact=args.c)
+    if args.f:
+        name_index.build()
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    source = person_id_for_name(input("Name: "), policy=args.p, fuzzy=args.f)
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_id_for_name(input("Name: "), policy=args.p, fuzzy=args.f)
     if target is None:
         sys.exit("Person not found.")
 
+    if args.k is not None:
+        for number, path in enumerate(shortest_paths(source, target, args.k), 1):
+            print(f"Path {number}:")
+            print_path(source, path)
+        return
+
     path = shortest_path(source, target, search_method)
 
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
+
+
+def print_path(source, path):
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = people[path[i][1]]["name"]
+        person2 = people[path[i + 1][1]]["name"]
+        movie = movies[path[i + 1][0]]["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def enable_cache(max_cost=1_000_000, tree_after=2):
+    """
+    Backs shortest_path with an LRU cache of paths and BFS trees of hot sources.
+    """
+    global cache
+    cache = PathCache(neighbors_for_person, max_cost=max_cost, tree_after=tree_after)
+    return cache
 
 
 def shortest_path(source, target, search_method):
@@ -95,6 +176,28 @@ def shortest_path(source, target, search_method):
 
     If no possible path, returns None.
     """
+    if cache is not None:
+        return cache.shortest_path(source, target, search_method, search)
+    return search(source, target, search_method)
+
+
+def search(source, target, search_method):
+    """
+    Runs search_method from source to target without consulting the cache.
+    """
+    # the compact graph runs breadth-first search on its index arrays
+    if search_method == "bfs" and graph is not None:
+        return graph.shortest_path(source, target)
+
+    # bidirectional search keeps its own pair of frontiers
+    if search_method == "bibfs":
+        return bidirectional_path(source, target)
+
+    # A* guided by the landmark distance tables
+    if search_method == "alt":
+        if landmark_tables is None:
+            raise ValueError("no landmark tables loaded, run landmarks.py on the dataset first")
+        return landmark_tables.shortest_path(source, target, neighbors_for_person)
 
     # initialize the frontier
     if search_method == "bfs":
@@ -120,7 +223,7 @@ def shortest_path(source, target, search_method):
     while True:
         # if nothing left in frontier, then no path
         if frontier.empty():
-            raise Exception("no solution")
+            return None
 
         # get next queue item and it's star's person_id
         starbud = frontier.remove()
@@ -147,15 +250,103 @@ def shortest_path(source, target, search_method):
                 explored_person_ids.add(person_id)
 
 
-def person_id_for_name(name):
+def bidirectional_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one BFS frontier
+    from each end and joining them where they meet.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # per side: person_id -> (movie_id, person_id one step closer to the side's root)
+    parents = ({source: None}, {target: None})
+    depths = ({source: 0}, {target: 0})
+    frontiers = ([source], [target])
+
+    while frontiers[0] and frontiers[1]:
+        # expand the smaller frontier by one full level
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        other = 1 - side
+        next_frontier = []
+        meeting = None
+        best = None
+
+        for person_id in frontiers[side]:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in parents[side]:
+                    continue
+                parents[side][neighbor_id] = (movie_id, person_id)
+                depths[side][neighbor_id] = depths[side][person_id] + 1
+                next_frontier.append(neighbor_id)
+
+                # frontiers touched, keep the shortest join of this level
+                if neighbor_id in parents[other]:
+                    length = depths[side][neighbor_id] + depths[other][neighbor_id]
+                    if best is None or length < best:
+                        best = length
+                        meeting = neighbor_id
+
+        if meeting is not None:
+            return join_paths(meeting, parents[0], parents[1])
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+
+    return None
+
+
+def join_paths(meeting, forward_parents, backward_parents):
+    """
+    Builds the (movie_id, person_id) path through the meeting person
+    from the parent maps of a bidirectional search.
+    """
+    # walk back from the meeting person to the source
+    path = []
+    person_id = meeting
+    while forward_parents[person_id] is not None:
+        movie_id, previous_id = forward_parents[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous_id
+    path.reverse()
+
+    # walk forward from the meeting person to the target
+    person_id = meeting
+    while backward_parents[person_id] is not None:
+        movie_id, next_id = backward_parents[person_id]
+        path.append((movie_id, next_id))
+        person_id = next_id
+    return path
+
+
+def shortest_paths(source, target, k=None):
+    """
+    Yields the shortest lists of (movie_id, person_id) pairs that connect
+    the source to the target: all of equal minimal length, or with k the
+    k shortest simple paths, ordered by length.
+    """
+    if k is None:
+        return all_shortest_paths(source, target, neighbors_for_person)
+    return k_shortest_paths(source, target, neighbors_for_person, k)
+
+
+def person_id_for_name(name, policy="ask", fuzzy=False):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    policy decides between people sharing the name: "ask" prompts for
+    the intended ID, "most_movies" picks the one with the most movies and
+    "all" returns the list of all candidates (most movies first).
+    With fuzzy=True a name without exact match resolves to the closest
+    names within a couple of typos.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = name_index.lookup(name, fuzzy=fuzzy)
+    if policy == "all":
+        return person_ids
     if len(person_ids) == 0:
         return None
-    elif len(person_ids) > 1:
+    elif len(person_ids) > 1 and policy == "ask":
         print(f"Which '{name}'?")
         for person_id in person_ids:
             person = people[person_id]
@@ -173,11 +364,23 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def movie_count(person_id):
+    """
+    Returns the number of movies a person starred in.
+    """
+    if graph is not None:
+        p = graph.person_index[person_id]
+        return graph.person_offsets[p + 1] - graph.person_offsets[p]
+    return len(people[person_id]["movies"])
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
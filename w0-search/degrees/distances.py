@@ -0,0 +1,141 @@
+import argparse
+import functools
+import multiprocessing
+import random
+import sys
+from collections import Counter
+
+import degrees
+from graph import UNEXPLORED
+
+# Distance analytics on top of the degrees graph: single-source BFS levels,
+# "Bacon number" tables, distance histograms and eccentricity/diameter
+# estimates, with many BFS sources run in parallel by a process pool.
+
+
+def bfs_levels(source):
+    """
+    Returns a dict mapping every person_id reachable from source
+    to their number of hops from source (0 for source itself).
+    """
+    graph = degrees.graph
+    if graph is not None:
+        levels = graph.bfs_levels(graph.person_index[source])
+        return {graph.person_ids[p]: hops
+                for p, hops in enumerate(levels) if hops != UNEXPLORED}
+
+    levels = {source: 0}
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for person_id in frontier:
+            for _, neighbor_id in degrees.neighbors_for_person(person_id):
+                if neighbor_id not in levels:
+                    levels[neighbor_id] = levels[person_id] + 1
+                    next_frontier.append(neighbor_id)
+        frontier = next_frontier
+    return levels
+
+
+def histogram(levels):
+    """
+    Returns a Counter of hops -> number of people at that distance.
+    """
+    return Counter(levels.values())
+
+
+def single_source(source, keep_levels=False):
+    """
+    Returns a summary of the BFS from source: its distance histogram,
+    eccentricity (largest finite distance), number of people reached and,
+    with keep_levels=True, the per-person hop counts.
+    """
+    levels = bfs_levels(source)
+    summary = {
+        "source": source,
+        "histogram": dict(sorted(histogram(levels).items())),
+        "eccentricity": max(levels.values()),
+        "reached": len(levels)
+    }
+    if keep_levels:
+        summary["levels"] = levels
+    return summary
+
+
+def init_worker(directory, compact):
+    """
+    Loads the dataset in a pool worker unless it was inherited through fork.
+    """
+    if not degrees.people:
+        degrees.load_data(directory, compact=compact)
+
+
+def run_sources(sources, directory, compact=False, processes=None, keep_levels=False):
+    """
+    Runs single_source for every source on a process pool and yields the
+    summaries as they finish.
+
+    The parent's dataset must already be loaded: on platforms with fork the
+    workers share it read-only, elsewhere each worker loads directory itself
+    (from the memory-mapped snapshot when compact and one is available).
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with context.Pool(processes, initializer=init_worker,
+                      initargs=(directory, compact)) as pool:
+        job = functools.partial(single_source, keep_levels=keep_levels)
+        yield from pool.imap_unordered(job, sources, chunksize=max(1, len(sources) // 64))
+
+
+def bacon_numbers(center):
+    """
+    Returns a dict person_id -> hops from center, sorted by hops.
+    """
+    return dict(sorted(bfs_levels(center).items(), key=lambda item: item[1]))
+
+
+def estimate_diameter(summaries):
+    """
+    Returns a lower bound of the graph diameter from BFS summaries:
+    the largest eccentricity among the sources.
+    """
+    return max(summary["eccentricity"] for summary in summaries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", type=str, help="dataset folder to load", choices=["small", "large"], default="small")
+    parser.add_argument("-c", help="store the stars in a compact integer-indexed graph", action="store_true")
+    parser.add_argument("-p", type=int, help="worker processes (default: cpu count)", default=None)
+    parser.add_argument("-n", type=int, help="number of random BFS sources", default=16)
+    parser.add_argument("--bacon", type=str, metavar="NAME", help="print the hop table for one person")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.d, compact=args.c)
+    print("Data loaded.")
+
+    if args.bacon is not None:
+        center = degrees.person_id_for_name(args.bacon)
+        if center is None:
+            sys.exit("Person not found.")
+        for person_id, hops in bacon_numbers(center).items():
+            print(f"{hops}: {degrees.people[person_id]['name']}")
+        return
+
+    # sample sources and aggregate their histograms
+    sources = random.sample(list(degrees.people), min(args.n, len(degrees.people)))
+    total = Counter()
+    summaries = []
+    for summary in run_sources(sources, args.d, compact=args.c, processes=args.p):
+        summaries.append(summary)
+        total.update(summary["histogram"])
+
+    print(f"Distances from {len(sources)} sources:")
+    for hops, count in sorted(total.items()):
+        print(f"  {hops} hops: {count}")
+    print(f"Diameter >= {estimate_diameter(summaries)}")
+
+
+if __name__ == "__main__":
+    main()
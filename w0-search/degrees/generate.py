@@ -0,0 +1,120 @@
+import argparse
+import csv
+import os
+import random
+
+# Writes a synthetic dataset in the people.csv / movies.csv / stars.csv format.
+#
+# Cast sizes follow a Pareto (power-law) distribution, and the people cast
+# in a movie are drawn with Zipf-like popularity, so a few people star in
+# very many movies and most in one or two, like on IMDB. Most last names are
+# made of random syllables, so names repeat about as rarely as real ones.
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+    "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Charles", "Karen", "Daniel", "Nancy", "Matthew", "Lisa",
+    "Anthony", "Betty", "Mark", "Margaret", "Paul", "Sandra", "Steven", "Ashley",
+    "Kevin", "Emily", "Brian", "Donna", "George", "Michelle", "Edward", "Carol",
+    "Ronald", "Amanda", "Timothy", "Melissa", "Jason", "Deborah", "Jeffrey", "Stephanie"
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas",
+    "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White",
+    "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson", "Walker", "Young",
+    "Allen", "King", "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores",
+    "Green", "Adams", "Nelson", "Baker", "Hall", "Rivera", "Campbell", "Mitchell"
+]
+SYLLABLES = [
+    "an", "ber", "cal", "dor", "el", "fen", "gar", "hol", "is", "jen",
+    "kel", "lin", "mar", "nor", "ol", "per", "quin", "ros", "sel", "tor",
+    "ul", "van", "wes", "yar", "zan", "bri", "cha", "dru", "fra", "gro",
+    "har", "kin", "lo", "mi", "ne", "ra", "sto", "ton", "ley", "son",
+    "ford", "wood", "field", "berg", "man", "ski", "ez", "ov", "ard", "ing"
+]
+WORDS = [
+    "Night", "Day", "Return", "Last", "First", "Dark", "Light", "City", "River",
+    "Road", "Home", "Star", "Storm", "Silent", "Golden", "Lost", "Secret", "Wild",
+    "Heart", "Fire", "Ice", "Dream", "Shadow", "Summer", "Winter", "Edge", "Stone"
+]
+
+
+def cast_size(rng, shape, max_cast):
+    """Draws a power-law distributed cast size between 1 and max_cast."""
+    return min(int(rng.paretovariate(shape)), max_cast)
+
+
+def last_name(rng):
+    """Draws a common last name one time in five, else one of 2 to 3 syllables."""
+    if rng.random() < 0.2:
+        return rng.choice(LAST_NAMES)
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+
+def popular_person(rng, n_people, skew):
+    """
+    Draws a person index with Zipf-like popularity: the density of index x is
+    proportional to x ** -skew, sampled by inverting its CDF.
+    """
+    return min(int(n_people * rng.random() ** (1 / (1 - skew))), n_people - 1)
+
+
+def generate(directory, n_people, n_movies=None, shape=1.4, skew=0.5,
+             max_cast=100, seed=0):
+    """
+    Writes people.csv, movies.csv and stars.csv with n_people people and
+    n_movies movies (a third of n_people by default) to directory.
+    Rows are streamed, so memory stays flat at any scale.
+    """
+    if not 0 <= skew < 1:
+        raise ValueError("skew must be between 0 and 1")
+    rng = random.Random(seed)
+    if n_movies is None:
+        n_movies = max(1, n_people // 3)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(n_people):
+            name = f"{rng.choice(FIRST_NAMES)} {last_name(rng)}"
+            writer.writerow([i + 1, name, rng.randint(1900, 2005)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for i in range(n_movies):
+            title = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+            writer.writerow([i + 1, title, rng.randint(1920, 2020)])
+
+    n_stars = 0
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie_id in range(1, n_movies + 1):
+            cast = {popular_person(rng, n_people, skew)
+                    for _ in range(cast_size(rng, shape, max_cast))}
+            for p in cast:
+                writer.writerow([p + 1, movie_id])
+            n_stars += len(cast)
+    return n_stars
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", type=str, help="folder to write the CSVs to")
+    parser.add_argument("-n", type=int, help="number of people", default=10_000)
+    parser.add_argument("--movies", type=int, help="number of movies (default: a third of people)", default=None)
+    parser.add_argument("--shape", type=float, help="Pareto shape of cast sizes", default=1.4)
+    parser.add_argument("--skew", type=float, help="Zipf exponent of popularity, between 0 and 1", default=0.5)
+    parser.add_argument("--seed", type=int, help="random seed", default=0)
+    args = parser.parse_args()
+
+    n_stars = generate(args.directory, args.n, args.movies, shape=args.shape,
+                       skew=args.skew, seed=args.seed)
+    print(f"Wrote {args.n} people and {n_stars} stars to {args.directory}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+from array import array
+
+# sentinels for the parent array of a search
+UNEXPLORED = -1
+ROOT = -2
+
+
+class CompactGraph():
+    """
+    Bipartite person/movie star graph stored in CSR (compressed sparse row) form.
+
+    Person and movie IDs are mapped to dense integers. For person p, the
+    indices of their movies are person_movies[person_offsets[p]:person_offsets[p + 1]],
+    and for movie m the indices of its stars are
+    movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_people):
+        # index -> IMDB id
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        # IMDB id -> index
+        self.person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        self.movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+    @classmethod
+    def from_stars(cls, person_ids, movie_ids, stars):
+        """
+        Builds the graph from lists of person and movie IDs and an iterable
+        of (person_id, movie_id) pairs. Pairs naming unknown IDs are skipped
+        and duplicate pairs are stored once.
+        """
+        person_ids = list(person_ids)
+        movie_ids = list(movie_ids)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        n_movies = len(movie_ids)
+
+        # encode every edge as one int so sorting groups them by person
+        keys = set()
+        for person_id, movie_id in stars:
+            p = person_index.get(person_id)
+            m = movie_index.get(movie_id)
+            if p is None or m is None:
+                continue
+            keys.add(p * n_movies + m)
+        keys = sorted(keys)
+
+        # person -> movies rows come straight out of the sorted keys
+        person_offsets = array("q", [0]) * (len(person_ids) + 1)
+        person_movies = array("q", [0]) * len(keys)
+        movie_counts = array("q", [0]) * (n_movies + 1)
+        for i, key in enumerate(keys):
+            p, m = divmod(key, n_movies)
+            person_offsets[p + 1] += 1
+            person_movies[i] = m
+            movie_counts[m + 1] += 1
+        for p in range(len(person_ids)):
+            person_offsets[p + 1] += person_offsets[p]
+
+        # movie -> people rows are filled with a counting sort
+        for m in range(n_movies):
+            movie_counts[m + 1] += movie_counts[m]
+        movie_offsets = array("q", movie_counts)
+        movie_people = array("q", [0]) * len(keys)
+        for key in keys:
+            p, m = divmod(key, n_movies)
+            movie_people[movie_counts[m]] = p
+            movie_counts[m] += 1
+
+        return cls(person_ids, movie_ids, person_offsets, person_movies,
+                   movie_offsets, movie_people)
+
+    def movies_of(self, p):
+        """Returns the movie indices person index p starred in."""
+        return self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+
+    def stars_of(self, m):
+        """Returns the person indices starring in movie index m."""
+        return self.movie_people[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+
+    def neighbor_indices(self, p):
+        """Yields (movie index, person index) pairs for co-stars of person index p."""
+        for m in self.movies_of(p):
+            for q in self.stars_of(m):
+                yield m, q
+
+    def neighbors(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        p = self.person_index[person_id]
+        return {(self.movie_ids[m], self.person_ids[q])
+                for m, q in self.neighbor_indices(p)}
+
+    def shortest_path(self, source, target):
+        """
+        Breadth-first search over the index arrays. Returns the shortest
+        list of (movie_id, person_id) pairs that connect the source to the target,
+        or None if there is none.
+        """
+        start = self.person_index[source]
+        goal = self.person_index[target]
+
+        # parent person and connecting movie per person index,
+        # UNEXPLORED until reached and ROOT for the first level
+        parent = array("q", [UNEXPLORED]) * len(self.person_ids)
+        via = array("q", [UNEXPLORED]) * len(self.person_ids)
+
+        # like the dict based search, the first level is the source's neighbors
+        queue = []
+        for m, q in self.neighbor_indices(start):
+            if parent[q] == UNEXPLORED:
+                parent[q] = ROOT
+                via[q] = m
+                queue.append(q)
+
+        head = 0
+        while head < len(queue):
+            p = queue[head]
+            head += 1
+            if p == goal:
+                path = []
+                while p != ROOT:
+                    path.append((self.movie_ids[via[p]], self.person_ids[p]))
+                    p = parent[p]
+                path.reverse()
+                return path
+            for m, q in self.neighbor_indices(p):
+                if parent[q] == UNEXPLORED:
+                    parent[q] = p
+                    via[q] = m
+                    queue.append(q)
+
+        return None
+
+    def bfs_levels(self, start):
+        """
+        Returns an array with the number of hops from person index start to
+        every person index, UNEXPLORED for people that can't be reached.
+        """
+        levels = array("q", [UNEXPLORED]) * len(self.person_ids)
+        levels[start] = 0
+        queue = [start]
+        head = 0
+        while head < len(queue):
+            p = queue[head]
+            head += 1
+            for m in self.movies_of(p):
+                for q in self.stars_of(m):
+                    if levels[q] == UNEXPLORED:
+                        levels[q] = levels[p] + 1
+                        queue.append(q)
+        return levels
@@ -0,0 +1,208 @@
+import heapq
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from snapshot import is_fresh
+
+# ALT search (A*, landmarks, triangle inequality).
+#
+# BFS distances from a few dozen high-degree "landmark" people are computed
+# once and written next to the CSVs. For any landmark L, |d(L, t) - d(L, v)|
+# is a lower bound of d(v, t), so the maximum over all landmarks is an
+# admissible A* heuristic towards target t.
+#
+# Layout: fixed header, int64 person indices of the landmarks, then one
+# int32 distance row of n_people entries per landmark (-1 = unreachable).
+LANDMARKS_FILE = "degrees.landmarks"
+MAGIC = b"DEGLMK\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sII2q")
+LANDMARK_COUNT = 32
+UNREACHABLE = -1
+
+
+class Landmarks():
+    """
+    BFS distance tables from landmark people, indexed like person_ids.
+    """
+
+    def __init__(self, person_ids, landmarks, rows):
+        self.person_ids = person_ids
+        self.person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        self.landmarks = landmarks
+        self.rows = rows
+
+    def lower_bound(self, v, t):
+        """
+        Returns a lower bound of the hops between person indices v and t,
+        or None if a landmark proves they aren't connected.
+        """
+        bound = 0
+        for row in self.rows:
+            dv, dt = row[v], row[t]
+            if dv == UNREACHABLE or dt == UNREACHABLE:
+                # a landmark reaching only one of them splits them apart
+                if dv != dt:
+                    return None
+                continue
+            if abs(dv - dt) > bound:
+                bound = abs(dv - dt)
+        return bound
+
+    def shortest_path(self, source, target, neighbors):
+        """
+        A* search from source to target guided by the landmark bound.
+        Returns the shortest list of (movie_id, person_id) pairs that
+        connect the source to the target, or None if there is none.
+        """
+        if source == target:
+            return []
+        goal = self.person_index[target]
+        if self.lower_bound(self.person_index[source], goal) is None:
+            return None
+
+        # person_id -> (movie_id, parent person_id), None for the source
+        parents = {source: None}
+        hops = {source: 0}
+        closed = set()
+        # heap of (hops + bound, -hops, tie breaker, person_id)
+        heap = [(0, 0, 0, source)]
+        pushed = 1
+
+        while heap:
+            _, _, _, person_id = heapq.heappop(heap)
+            if person_id in closed:
+                continue
+            if person_id == target:
+                path = []
+                while parents[person_id] is not None:
+                    movie_id, parent_id = parents[person_id]
+                    path.append((movie_id, person_id))
+                    person_id = parent_id
+                path.reverse()
+                return path
+            closed.add(person_id)
+
+            g = hops[person_id] + 1
+            for movie_id, neighbor_id in neighbors(person_id):
+                if neighbor_id in closed or hops.get(neighbor_id, g + 1) <= g:
+                    continue
+                bound = self.lower_bound(self.person_index[neighbor_id], goal)
+                if bound is None:
+                    continue
+                hops[neighbor_id] = g
+                parents[neighbor_id] = (movie_id, person_id)
+                heapq.heappush(heap, (g + bound, -g, pushed, neighbor_id))
+                pushed += 1
+
+        return None
+
+
+def bfs_row(start, person_index, neighbors, graph=None):
+    """
+    Returns an int32 array of hops from person index start to every person index.
+    """
+    if graph is not None:
+        return array("i", graph.bfs_levels(start))
+    person_ids = list(person_index)
+    row = array("i", [UNREACHABLE]) * len(person_ids)
+    row[start] = 0
+    frontier = [person_ids[start]]
+    while frontier:
+        next_frontier = []
+        for person_id in frontier:
+            hops = row[person_index[person_id]] + 1
+            for _, neighbor_id in neighbors(person_id):
+                q = person_index[neighbor_id]
+                if row[q] == UNREACHABLE:
+                    row[q] = hops
+                    next_frontier.append(neighbor_id)
+        frontier = next_frontier
+    return row
+
+
+def build_landmarks(person_ids, neighbors, movie_count, graph=None, count=LANDMARK_COUNT):
+    """
+    Picks the count people with the most movies as landmarks
+    and computes their BFS distance rows.
+    """
+    person_ids = list(person_ids)
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    chosen = sorted(person_ids, key=lambda person_id: -movie_count(person_id))[:count]
+    landmarks = [person_index[person_id] for person_id in chosen]
+    rows = [bfs_row(p, person_index, neighbors, graph) for p in landmarks]
+    return Landmarks(person_ids, landmarks, rows)
+
+
+def landmarks_path(directory):
+    return os.path.join(directory, LANDMARKS_FILE)
+
+
+def write_landmarks(directory, landmarks):
+    """
+    Writes the landmark distance tables next to the directory's CSVs.
+    """
+    byteorder = 1 if sys.byteorder == "little" else 0
+    path = landmarks_path(directory)
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, byteorder,
+                            len(landmarks.person_ids), len(landmarks.landmarks)))
+        f.write(array("q", landmarks.landmarks).tobytes())
+        for row in landmarks.rows:
+            f.write(array("i", row).tobytes())
+    os.replace(path + ".tmp", path)
+
+
+def read_landmarks(directory, person_ids):
+    """
+    Memory-maps the directory's landmark tables if they are newer than the
+    CSVs and match person_ids, else returns None.
+    """
+    if not is_fresh(directory, LANDMARKS_FILE):
+        return None
+    try:
+        with open(landmarks_path(directory), "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(buffer) < HEADER.size:
+        return None
+    magic, version, byteorder, n_people, count = HEADER.unpack_from(buffer)
+    if (magic != MAGIC or version != VERSION
+            or byteorder != (sys.byteorder == "little")
+            or n_people != len(person_ids)):
+        return None
+
+    view = memoryview(buffer)
+    offset = HEADER.size
+    landmarks = list(view[offset:offset + 8 * count].cast("q"))
+    offset += 8 * count
+    rows = []
+    for _ in range(count):
+        rows.append(view[offset:offset + 4 * n_people].cast("i"))
+        offset += 4 * n_people
+    return Landmarks(list(person_ids), landmarks, rows)
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python landmarks.py directory [count]")
+    directory = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) == 3 else LANDMARK_COUNT
+
+    import degrees
+    print("Loading data...")
+    degrees.load_data(directory, compact=True)
+    print(f"Computing distances from {count} landmarks...")
+    landmarks = build_landmarks(degrees.people, degrees.neighbors_for_person,
+                                degrees.movie_count, degrees.graph, count)
+    write_landmarks(directory, landmarks)
+    print(f"Landmarks written to {landmarks_path(directory)}.")
+
+
+if __name__ == "__main__":
+    main()
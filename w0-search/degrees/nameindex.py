@@ -0,0 +1,194 @@
+from array import array
+from bisect import bisect_left
+
+# largest edit distance of fuzzy lookups (and the default); walk() keeps
+# one bit vector per error count, so raising it means adding vectors there
+MAX_DISTANCE = 2
+
+
+class NameIndex():
+    """
+    Lookup structure over lowercase names -> person_ids.
+
+    Prefix completion runs on a sorted array of names (a flattened trie:
+    every prefix is one contiguous range found by bisection). Typo-tolerant
+    lookup walks the same trie depth first, carrying the states of a
+    Levenshtein automaton for the query as bit vectors, and skips every
+    subtree in which no state is left.
+
+    Walked from the front alone, the trie would be explored with the whole
+    error budget below every common first name. So one walk over the names
+    allows at most max_distance - 1 errors before the last third of the
+    query, and one over the reversed names matches that last third exactly:
+    every name within max_distance edits is found by one of them.
+
+    build() makes both arrays. server.py and degrees.py call it at startup,
+    other callers pay for it on first use. Candidates are ranked by number
+    of movies.
+    """
+
+    def __init__(self, names, movie_count):
+        self.names = names
+        self.movie_count = movie_count
+        # sorted names, see complete()
+        self.keys = None
+        # sorted_trie() of the names and of the reversed names, see fuzzy()
+        self.tries = None
+
+    def build(self):
+        """Builds the sorted name arrays complete() and fuzzy() walk."""
+        forward = sorted_trie(sorted(self.names))
+        backward = sorted_trie(sorted(key[::-1] for key in self.names))
+        self.keys = forward[0]
+        # set last, as server threads may look it up while another builds it
+        self.tries = (forward, backward)
+
+    def rank(self, person_ids):
+        """Orders person_ids by most movies first, then by id."""
+        return sorted(person_ids, key=lambda person_id: (-self.movie_count(person_id), person_id))
+
+    def exact(self, name):
+        """Returns the ranked person_ids with exactly this name."""
+        return self.rank(self.names.get(name.lower(), ()))
+
+    def complete(self, prefix, limit=10):
+        """Returns up to limit names starting with prefix, in alphabetical order."""
+        if self.keys is None:
+            self.build()
+        prefix = prefix.lower()
+        found = []
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(found) < limit and self.keys[i].startswith(prefix):
+            found.append(self.keys[i])
+            i += 1
+        return found
+
+    def fuzzy(self, name, max_distance=MAX_DISTANCE, limit=10):
+        """
+        Returns up to limit (name, distance) pairs within max_distance edits
+        of name, closest first. max_distance can't exceed MAX_DISTANCE.
+        """
+        if max_distance > MAX_DISTANCE:
+            raise ValueError(f"max_distance can be at most {MAX_DISTANCE}")
+        if self.tries is None:
+            self.build()
+        forward, backward = self.tries
+        name = name.lower()
+
+        full = (1 << (len(name) + 1)) - 1
+        allowed = [full if errors <= max_distance else 0 for errors in range(MAX_DISTANCE + 1)]
+        # a closest alignment either has an error in the last third of name,
+        # and so fewer than max_distance before it, or matches it exactly
+        tail = (len(name) + 2) // 3
+        matches = {}
+        if max_distance:
+            head = (1 << (len(name) - tail)) - 1
+            matches = walk(forward, name, allowed[:max_distance]
+                           + [level & ~head for level in allowed[max_distance:]])
+        exact_tail = [allowed[0]] + [level & ~((1 << tail) - 1) for level in allowed[1:]]
+        for key, distance in walk(backward, name[::-1], exact_tail).items():
+            key = key[::-1]
+            matches[key] = min(distance, matches.get(key, distance))
+
+        ranked = sorted((distance, key) for key, distance in matches.items())
+        return [(key, distance) for distance, key in ranked[:limit]]
+
+    def lookup(self, name, fuzzy=False):
+        """
+        Returns the ranked person_ids for name, falling back to the closest
+        fuzzy matches if fuzzy and there is no exact match.
+        """
+        person_ids = self.exact(name)
+        if person_ids or not fuzzy:
+            return person_ids
+        matches = self.fuzzy(name)
+        if not matches:
+            return []
+        closest = matches[0][1]
+        return self.rank(person_id for key, distance in matches if distance == closest
+                         for person_id in self.names[key])
+
+
+def sorted_trie(keys):
+    """
+    Returns (keys, shared, skip, longest) for sorted keys: shared[i] is the
+    length of the prefix keys[i] shares with keys[i - 1] (capped at 255,
+    which only costs some walking), skip[i] the first index after i sharing
+    less than that, and longest the length of the longest key. A subtree
+    below depth d starting at i ends at the first index whose shared is at
+    most d, which following skip from i + 1 reaches in a few steps.
+    """
+    shared = array("B", [0]) * len(keys)
+    for i in range(1, len(keys)):
+        previous, key = keys[i - 1], keys[i]
+        length = 0
+        for a, b in zip(previous, key):
+            if a != b:
+                break
+            length += 1
+        shared[i] = min(length, 255)
+
+    skip = array("I", [len(keys)]) * len(keys)
+    pending = []
+    for i, length in enumerate(shared):
+        while pending and shared[pending[-1]] > length:
+            skip[pending.pop()] = i
+        pending.append(i)
+
+    longest = max(map(len, keys), default=0)
+    return keys, shared, skip, longest
+
+
+def walk(trie, name, allowed):
+    """
+    Returns {key: distance} for the keys of a sorted_trie() within
+    MAX_DISTANCE edits of name, counting only alignments that stay in
+    allowed: per number of errors, a bit mask of the query positions
+    (0 to len(name)) an alignment with that many errors may be at.
+
+    Bit j of the state vector for e errors is set when the key prefix
+    walked so far can be aligned to name[:j] with e errors. Prefixes with
+    no bit left are skipped along with all keys that share them.
+    """
+    keys, shared, skip, longest = trie
+    masks = {}
+    for j, c in enumerate(name):
+        masks[c] = masks.get(c, 0) | 2 << j
+    accept = 1 << len(name)
+    allowed0, allowed1, allowed2 = allowed
+    # states per depth of the current key; before any key character,
+    # e errors can only delete the first e characters of name
+    states0 = [1 & allowed0] * (longest + 1)
+    states1 = [3 & allowed1] * (longest + 1)
+    states2 = [7 & allowed2] * (longest + 1)
+
+    found = {}
+    i, depth = 0, 0
+    while i < len(keys):
+        key = keys[i]
+        errors0, errors1, errors2 = states0[depth], states1[depth], states2[depth]
+        for depth in range(depth, len(key)):
+            match = masks.get(key[depth], 0)
+            # match, or (from one error less) substitute, insert or delete
+            next0 = errors0 << 1 & match & allowed0
+            next1 = (errors1 << 1 & match | errors0 | (errors0 | next0) << 1) & allowed1
+            next2 = (errors2 << 1 & match | errors1 | (errors1 | next1) << 1) & allowed2
+            if not next0 | next1 | next2:
+                # skip the keys below key[:depth + 1]
+                i += 1
+                while i < len(keys) and shared[i] > depth:
+                    i = skip[i]
+                break
+            errors0, errors1, errors2 = next0, next1, next2
+            states0[depth + 1], states1[depth + 1], states2[depth + 1] = next0, next1, next2
+        else:
+            if errors0 & accept:
+                found[key] = 0
+            elif errors1 & accept:
+                found[key] = 1
+            elif errors2 & accept:
+                found[key] = 2
+            i += 1
+        if i < len(keys):
+            depth = shared[i]
+    return found
@@ -0,0 +1,118 @@
+import heapq
+from collections import deque
+
+from util import MultiNode
+
+# Lazy enumeration of several paths between two people.
+# Paths are lists of (movie_id, person_id) pairs like shortest_path returns;
+# the same two people linked by another movie make a different path.
+
+
+def shortest_path_dag(source, target, neighbors):
+    """
+    Breadth-first search from source that keeps every parent one level up.
+    Returns the MultiNode of target, or None if it can't be reached.
+    """
+    nodes = {source: MultiNode(state=source, parent=None, level=0)}
+    level = [nodes[source]]
+    while level and target not in nodes:
+        next_level = []
+        for node in level:
+            for movie_id, person_id in neighbors(node.state):
+                child = nodes.get(person_id)
+                if child is None:
+                    child = MultiNode(state=person_id, parent=node, level=node.level + 1)
+                    nodes[person_id] = child
+                    next_level.append(child)
+                elif child.level != node.level + 1:
+                    continue
+                child.add_parent(movie_id, node)
+        level = next_level
+    return nodes.get(target)
+
+
+def all_shortest_paths(source, target, neighbors):
+    """
+    Yields every shortest path from source to target, one at a time.
+    """
+    node = shortest_path_dag(source, target, neighbors)
+    if node is None:
+        return
+
+    # walk the parent links back to the source, depth first
+    stack = [(node, [])]
+    while stack:
+        node, suffix = stack.pop()
+        if not node.parents:
+            yield suffix
+            continue
+        for movie_id, parent in reversed(node.parents):
+            stack.append((parent, [(movie_id, node.state)] + suffix))
+
+
+def restricted_path(source, target, neighbors, banned_people, banned_edges):
+    """
+    Returns a shortest path from source to target that avoids banned_people and
+    the banned (person_id, (movie_id, person_id)) edges, or None if there is none.
+    """
+    parents = {source: None}
+    queue = deque([source])
+    while queue:
+        person_id = queue.popleft()
+        if person_id == target:
+            path = []
+            while parents[person_id] is not None:
+                movie_id, parent_id = parents[person_id]
+                path.append((movie_id, person_id))
+                person_id = parent_id
+            path.reverse()
+            return path
+        for neighbor in neighbors(person_id):
+            movie_id, neighbor_id = neighbor
+            if (neighbor_id in parents or neighbor_id in banned_people
+                    or (person_id, neighbor) in banned_edges):
+                continue
+            parents[neighbor_id] = (movie_id, person_id)
+            queue.append(neighbor_id)
+    return None
+
+
+def k_shortest_paths(source, target, neighbors, k=None):
+    """
+    Yields up to k (or all) simple paths from source to target,
+    shortest first, using Yen's algorithm.
+    """
+    first = restricted_path(source, target, neighbors, set(), set())
+    if first is None:
+        return
+    found = [first]
+    yield first
+
+    candidates = []
+    seen = {tuple(first)}
+    pushed = 0
+    while k is None or len(found) < k:
+        last = found[-1]
+        people_on_path = [source] + [person_id for _, person_id in last]
+
+        # deviate from the last path at every person along it
+        for i in range(len(last)):
+            spur = people_on_path[i]
+            root = last[:i]
+            banned_edges = {(spur, path[i]) for path in found
+                            if len(path) > i and path[:i] == root}
+            banned_people = set(people_on_path[:i])
+            spur_path = restricted_path(spur, target, neighbors, banned_people, banned_edges)
+            if spur_path is None:
+                continue
+            candidate = root + spur_path
+            if tuple(candidate) not in seen:
+                seen.add(tuple(candidate))
+                heapq.heappush(candidates, (len(candidate), pushed, candidate))
+                pushed += 1
+
+        if not candidates:
+            return
+        _, _, path = heapq.heappop(candidates)
+        found.append(path)
+        yield path
@@ -0,0 +1,213 @@
+import argparse
+import json
+import socketserver
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+# Long-lived query mode: the dataset is loaded once and every source/target
+# pair read afterwards is answered with one JSON line including its timing.
+#
+# A query is a JSON object {"source": name, "target": name} (or "source_id" /
+# "target_id" with IMDB ids). Files and stdin may also hold "name<TAB>name" lines.
+
+
+def resolve(query, key, policy, fuzzy):
+    """
+    Returns the person_id for the query's key ("source" or "target"),
+    never asking interactively. Raises ValueError if it can't be resolved.
+
+    policy is "most_movies" to pick the best known of several people with
+    the name, or "all" to report them as an error listing the candidates.
+    """
+    if f"{key}_id" in query:
+        person_id = str(query[f"{key}_id"])
+        if person_id not in degrees.people:
+            raise ValueError(f"unknown {key}_id '{person_id}'")
+        return person_id
+
+    name = query.get(key)
+    if name is None:
+        raise ValueError(f"missing {key}")
+    person_ids = degrees.person_id_for_name(name, policy="all", fuzzy=fuzzy)
+    if len(person_ids) == 0:
+        raise ValueError(f"person '{name}' not found")
+    if len(person_ids) > 1 and policy == "all":
+        raise ValueError(f"name '{name}' is ambiguous: {person_ids}")
+    return person_ids[0]
+
+
+def answer(query, search_method, policy="all", fuzzy=False):
+    """
+    Answers one query and returns the result as a dict.
+    options are the search method and the name resolution policy and fuzziness.
+    """
+    start = time.perf_counter()
+    result = {"source": query.get("source", query.get("source_id")),
+              "target": query.get("target", query.get("target_id"))}
+    try:
+        source = resolve(query, "source", policy, fuzzy)
+        target = resolve(query, "target", policy, fuzzy)
+        path = degrees.shortest_path(source, target, query.get("method", search_method))
+    except Exception as e:
+        result["error"] = str(e)
+    else:
+        if path is None:
+            result["degrees"] = None
+        else:
+            result["degrees"] = len(path)
+            result["path"] = [{
+                "movie_id": movie_id,
+                "movie": degrees.movies[movie_id]["title"],
+                "person_id": person_id,
+                "person": degrees.people[person_id]["name"]
+            } for movie_id, person_id in path]
+    result["ms"] = round((time.perf_counter() - start) * 1000, 3)
+    if degrees.cache is not None:
+        result["cache"] = degrees.cache.stats()
+    return result
+
+
+def parse_line(line):
+    """
+    Parses a JSON line or a "source<TAB>target" line into a query dict.
+    Returns None for blank lines.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        return json.loads(line)
+    source, target = line.split("\t")
+    return {"source": source, "target": target}
+
+
+def serve_lines(lines, out, options):
+    """
+    Answers every query in lines and streams one JSON result per line to out.
+    """
+    for line in lines:
+        try:
+            query = parse_line(line)
+        except ValueError as e:
+            out.write(json.dumps({"error": f"bad query: {e}"}) + "\n")
+            out.flush()
+            continue
+        if query is None:
+            continue
+        out.write(json.dumps(answer(query, **options)) + "\n")
+        out.flush()
+
+
+def serve_http(port, options):
+    """
+    Answers GET /path?source=..&target=.. and POST /path with a JSON query body,
+    and completes names with GET /complete?prefix=..
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path == "/path":
+                self.reply(answer(query, **options))
+            elif url.path == "/complete":
+                self.reply({"names": degrees.name_index.complete(query.get("prefix", ""))})
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            if self.path != "/path":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                query = json.loads(body)
+            except ValueError as e:
+                self.reply({"error": f"bad query: {e}"}, 400)
+                return
+            if not isinstance(query, dict):
+                self.reply({"error": "bad query: not a JSON object"}, 400)
+                return
+            self.reply(answer(query, **options))
+
+        def reply(self, result, status=200):
+            body = json.dumps(result).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    with ThreadingHTTPServer(("127.0.0.1", port), Handler) as server:
+        print(f"Serving on http://127.0.0.1:{port}/path", file=sys.stderr)
+        server.serve_forever()
+
+
+def serve_unix(path, options):
+    """
+    Answers JSON line queries on a Unix socket, one result line per query.
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            lines = (line.decode("utf-8") for line in self.rfile)
+            serve_lines(lines, TextWriter(self.wfile), options)
+
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"Serving on {path}", file=sys.stderr)
+        server.serve_forever()
+
+
+class TextWriter():
+    """Minimal text wrapper so serve_lines can write to a socket."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def write(self, text):
+        self.raw.write(text.encode("utf-8"))
+
+    def flush(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", type=str, help="dataset folder to load", choices=["small", "large"], default="small")
+    parser.add_argument("-m", type=str, help="default search method", choices=["bfs", "dfs", "bibfs", "alt"], default="bibfs")
+    parser.add_argument("-c", help="store the stars in a compact integer-indexed graph", action="store_true")
+    parser.add_argument("--cache", type=int, metavar="SIZE", help="cache paths and hot BFS trees up to SIZE stored people", default=0)
+    parser.add_argument("-p", type=str, help="pick the person with most movies for shared names, or report all", choices=["most_movies", "all"], default="all")
+    parser.add_argument("-f", help="tolerate typos in names", action="store_true")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--file", type=str, help="answer the queries in a file")
+    source.add_argument("--http", type=int, metavar="PORT", help="serve queries over HTTP on localhost")
+    source.add_argument("--unix", type=str, metavar="PATH", help="serve queries on a Unix socket")
+    args = parser.parse_args()
+
+    # Load data once for all queries
+    print("Loading data...", file=sys.stderr)
+    start = time.perf_counter()
+    degrees.load_data(args.d, compact=args.c)
+    # so the first /complete and fuzzy requests don't wait for the name arrays
+    degrees.name_index.build()
+    print(f"Data loaded in {time.perf_counter() - start:.2f}s.", file=sys.stderr)
+    if args.cache:
+        degrees.enable_cache(max_cost=args.cache)
+
+    options = {"search_method": args.m, "policy": args.p, "fuzzy": args.f}
+    if args.http is not None:
+        serve_http(args.http, options)
+    elif args.unix is not None:
+        serve_unix(args.unix, options)
+    elif args.file is not None:
+        with open(args.file, encoding="utf-8") as f:
+            serve_lines(f, sys.stdout, options)
+    else:
+        serve_lines(sys.stdin, sys.stdout, options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import CompactGraph
+
+# Binary snapshot of a loaded dataset, written next to the CSVs.
+#
+# Layout: fixed header, JSON blob with people and movies (in index order),
+# zero padding to 8 bytes, then the four int64 CSR arrays of the graph:
+# person_offsets, person_movies, movie_offsets, movie_people.
+SNAPSHOT_FILE = "degrees.snapshot"
+MAGIC = b"DEGSNAP\0"
+VERSION = 1
+HEADER = struct.Struct("<8sII4q")
+CSV_FILES = ["people.csv", "movies.csv", "stars.csv"]
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, SNAPSHOT_FILE)
+
+
+def is_fresh(directory, filename=SNAPSHOT_FILE):
+    """
+    Returns True if the directory has a snapshot (or other file built
+    from the CSVs) that is newer than its CSVs.
+    """
+    path = os.path.join(directory, filename)
+    if not os.path.exists(path):
+        return False
+    built = os.path.getmtime(path)
+    return all(os.path.getmtime(os.path.join(directory, name)) <= built
+               for name in CSV_FILES)
+
+
+def valid_header(fields, size):
+    """
+    Returns True if the unpacked HEADER fields are this version's, in this
+    machine's byte order, and describe a snapshot of exactly size bytes.
+    A truncated file fails, so its arrays are never read past its end.
+    """
+    magic, version, byteorder, n_people, n_movies, n_edges, meta_len = fields
+    if magic != MAGIC or version != VERSION or byteorder != (sys.byteorder == "little"):
+        return False
+    if min(n_people, n_movies, n_edges, meta_len) < 0:
+        return False
+    end = HEADER.size + meta_len
+    end += -end % 8
+    end += 8 * ((n_people + 1) + n_edges + (n_movies + 1) + n_edges)
+    return end == size
+
+
+def has_snapshot(directory):
+    """
+    Returns True if the directory has a fresh snapshot that read_snapshot
+    can load, checking only its header and size.
+    """
+    if not is_fresh(directory):
+        return False
+    try:
+        with open(snapshot_path(directory), "rb") as f:
+            header = f.read(HEADER.size)
+            size = os.fstat(f.fileno()).st_size
+    except OSError:
+        return False
+    if len(header) < HEADER.size:
+        return False
+    return valid_header(HEADER.unpack(header), size)
+
+
+def write_snapshot(directory, people, movies, graph):
+    """
+    Writes people, movies and the compact star graph to the directory's snapshot.
+    """
+    meta = json.dumps({
+        "people": [[person_id, people[person_id]["name"], people[person_id]["birth"]]
+                   for person_id in graph.person_ids],
+        "movies": [[movie_id, movies[movie_id]["title"], movies[movie_id]["year"]]
+                   for movie_id in graph.movie_ids],
+    }).encode("utf-8")
+    padding = -(HEADER.size + len(meta)) % 8
+    byteorder = 1 if sys.byteorder == "little" else 0
+
+    # write to a temporary file first so readers never see half a snapshot
+    path = snapshot_path(directory)
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, byteorder, len(graph.person_ids),
+                            len(graph.movie_ids), len(graph.person_movies), len(meta)))
+        f.write(meta)
+        f.write(b"\0" * padding)
+        for values in (graph.person_offsets, graph.person_movies,
+                       graph.movie_offsets, graph.movie_people):
+            f.write(array("q", values).tobytes())
+    os.replace(path + ".tmp", path)
+
+
+def read_snapshot(directory):
+    """
+    Memory-maps the directory's snapshot.
+
+    Returns (people, movies, graph), with the graph's CSR arrays backed by
+    the mapped file, or None if the snapshot is missing, of another version
+    or not the size its header describes.
+    """
+    try:
+        with open(snapshot_path(directory), "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(buffer) < HEADER.size:
+        return None
+    fields = HEADER.unpack_from(buffer)
+    if not valid_header(fields, len(buffer)):
+        return None
+    n_people, n_movies, n_edges, meta_len = fields[3:]
+
+    offset = HEADER.size
+    meta = json.loads(bytes(buffer[offset:offset + meta_len]).decode("utf-8"))
+    offset += meta_len
+    offset += -offset % 8
+
+    # slice the int64 arrays out of the mapping without copying them
+    view = memoryview(buffer)
+    arrays = []
+    for length in (n_people + 1, n_edges, n_movies + 1, n_edges):
+        arrays.append(view[offset:offset + 8 * length].cast("q"))
+        offset += 8 * length
+
+    people = {person_id: {"name": name, "birth": birth}
+              for person_id, name, birth in meta["people"]}
+    movies = {movie_id: {"title": title, "year": year}
+              for movie_id, title, year in meta["movies"]}
+    graph = CompactGraph(list(people), list(movies), *arrays)
+    return people, movies, graph
+
+
+def build_snapshot(directory):
+    """Loads the directory's CSVs and writes their snapshot."""
+    import degrees
+    degrees.load_data(directory, compact=True, use_snapshot=False)
+    write_snapshot(directory, degrees.people, degrees.movies, degrees.graph)
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python snapshot.py directory")
+    directory = sys.argv[1]
+
+    print("Loading data...")
+    build_snapshot(directory)
+    print(f"Snapshot written to {snapshot_path(directory)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+from collections import Counter, deque
+
+
 class Node():
     def __init__(self, state, parent):
         self.state = state
@@ -7,13 +10,17 @@ class Node():
 # could be used direclty without QueueFrontier below for DFS
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        # deque gives O(1) pops from both ends
+        self.frontier = deque()
+        # count of nodes per state so contains_state is a hash lookup
+        self.states = Counter()
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] += 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return self.states[state] > 0
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,17 +29,37 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(node)
             return node
 
+    def forget(self, node):
+        self.states[node.state] -= 1
+        if self.states[node.state] == 0:
+            del self.states[node.state]
+
 
-# BFS, based on StackFrontier above but different pull/remove mechanism
+# BFS, based on StackFrontier above but different pull/remove mechanism
 class QueueFrontier(StackFrontier):
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.forget(node)
             return node
+
+
+# Node of a level-by-level search that keeps every parent one level
+# closer to the root, so all shortest paths can be walked back from it
+class MultiNode(Node):
+    def __init__(self, state, parent, level):
+        super().__init__(state, parent)
+        self.level = level
+        # (action, parent node) pairs, the first one is also self.parent
+        self.parents = []
+
+    def add_parent(self, action, parent):
+        if not self.parents:
+            self.parent = parent
+        self.parents.append((action, parent))
@@ -0,0 +1,148 @@
+"""
+Bitboard Tic Tac Toe engine
+"""
+
+# A position is a pair of 9-bit integers (x, o): bit 3 * i + j is set
+# if X (or O) played cell (i, j).
+
+FULL = 0b111111111
+
+# rows, columns and diagonals
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# transposition table: (x, o) -> value of the position for X (1, 0 or -1)
+table = {}
+
+# number of positions visited by value() and limited_value(), for benchmarks
+nodes = 0
+
+
+def encode(board, x_mark="X", o_mark="O"):
+    """
+    Returns the (x, o) bit pair for a 3x3 board of marks.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == x_mark:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == o_mark:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def has_won(bits):
+    """
+    Returns True if bits contain a full row, column or diagonal.
+    """
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def x_to_move(x, o):
+    """
+    Returns True if X has the next turn (X always moves first).
+    """
+    return bin(x).count("1") == bin(o).count("1")
+
+
+def moves(x, o):
+    """
+    Returns the cell indices that are still empty, in board order.
+    """
+    empty = FULL & ~(x | o)
+    return [cell for cell in range(9) if empty >> cell & 1]
+
+
+def terminal(x, o):
+    return has_won(x) or has_won(o) or (x | o) == FULL
+
+
+def value(x, o):
+    """
+    Returns the minimax value of the position for X: 1 if X wins with
+    perfect play, -1 if O does, 0 for a tie. Positions are memoized in table.
+    """
+    global nodes
+    nodes += 1
+    key = (x, o)
+    if key in table:
+        return table[key]
+
+    if has_won(x):
+        result = 1
+    elif has_won(o):
+        result = -1
+    elif (x | o) == FULL:
+        result = 0
+    elif x_to_move(x, o):
+        result = -1
+        for cell in moves(x, o):
+            result = max(result, value(x | 1 << cell, o))
+            if result == 1:
+                break
+    else:
+        result = 1
+        for cell in moves(x, o):
+            result = min(result, value(x, o | 1 << cell))
+            if result == -1:
+                break
+
+    table[key] = result
+    return result
+
+
+def best_move(x, o):
+    """
+    Returns the optimal cell index for the player to move, or None if the game is over.
+    """
+    if terminal(x, o):
+        return None
+
+    if x_to_move(x, o):
+        scored = [(value(x | 1 << cell, o), cell) for cell in moves(x, o)]
+        best = max(score for score, _ in scored)
+    else:
+        scored = [(value(x, o | 1 << cell), cell) for cell in moves(x, o)]
+        best = min(score for score, _ in scored)
+    return next(cell for score, cell in scored if score == best)
+
+
+def limited_value(x, o, depth):
+    """
+    Like value(), but positions deeper than depth moves count as ties
+    (with depth 0 or less, every position not already won).
+    """
+    global nodes
+    nodes += 1
+    if has_won(x):
+        return 1
+    if has_won(o):
+        return -1
+    if (x | o) == FULL or depth <= 0:
+        return 0
+    if x_to_move(x, o):
+        return max(limited_value(x | 1 << cell, o, depth - 1) for cell in moves(x, o))
+    return min(limited_value(x, o | 1 << cell, depth - 1) for cell in moves(x, o))
+
+
+def limited_move(x, o, depth):
+    """
+    Returns the best cell index looking at most depth moves ahead,
+    or None if the game is over.
+    """
+    if terminal(x, o):
+        return None
+    if x_to_move(x, o):
+        scored = [(limited_value(x | 1 << cell, o, depth - 1), cell) for cell in moves(x, o)]
+        best = max(score for score, _ in scored)
+    else:
+        scored = [(limited_value(x, o | 1 << cell, depth - 1), cell) for cell in moves(x, o)]
+        best = min(score for score, _ in scored)
+    return next(cell for score, cell in scored if score == best)
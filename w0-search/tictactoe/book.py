@@ -0,0 +1,177 @@
+"""
+Symmetry-reduced Tic Tac Toe opening book
+"""
+
+import os
+import struct
+import sys
+
+import bitboard
+
+# Every reachable position, reduced under the 8 symmetries of the board
+# (rotations and reflections), solved once. Entries are stored as sorted
+# little-endian uint32: base-3 position key << 8 | best cell << 2 | value + 1,
+# where value is the minimax value for X and best cell is in the frame
+# of the canonical position.
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+
+def permutation(transform):
+    """
+    Returns the list mapping each cell index to its index after transform,
+    a function taking (i, j) to the transformed (i, j).
+    """
+    return [3 * a + b for a, b in (transform(i, j) for i in range(3) for j in range(3))]
+
+
+SYMMETRIES = [permutation(t) for t in (
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+)]
+
+
+def apply(perm, bits):
+    """Moves every set cell of bits to its place under perm."""
+    moved = 0
+    for cell in range(9):
+        if bits >> cell & 1:
+            moved |= 1 << perm[cell]
+    return moved
+
+
+def key(x, o):
+    """Returns the base-3 number of a position (0 empty, 1 X, 2 O per cell)."""
+    value = 0
+    for cell in reversed(range(9)):
+        value = 3 * value + (x >> cell & 1) + 2 * (o >> cell & 1)
+    return value
+
+
+def canonical(x, o):
+    """
+    Returns (key, perm) of the symmetric position with the smallest key,
+    perm being the symmetry that maps (x, o) onto it.
+    """
+    return min((key(apply(perm, x), apply(perm, o)), perm) for perm in SYMMETRIES)
+
+
+def decode(position):
+    """Returns the (x, o) bit pair of a base-3 position key."""
+    x = o = 0
+    for cell in range(9):
+        position, mark = divmod(position, 3)
+        if mark == 1:
+            x |= 1 << cell
+        elif mark == 2:
+            o |= 1 << cell
+    return x, o
+
+
+def canonical_positions():
+    """
+    Returns the canonical keys of every position reachable from the empty board.
+    """
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        position, _ = canonical(x, o)
+        if position in seen:
+            continue
+        seen.add(position)
+        if bitboard.terminal(x, o):
+            continue
+        x_turn = bitboard.x_to_move(x, o)
+        for cell in bitboard.moves(x, o):
+            stack.append((x | 1 << cell, o) if x_turn else (x, o | 1 << cell))
+    return seen
+
+
+def build():
+    """
+    Solves every non-terminal canonical position with the minimax engine.
+    Returns a dict: key -> (best cell, value for X).
+    """
+    book = {}
+    for position in canonical_positions():
+        x, o = decode(position)
+        if bitboard.terminal(x, o):
+            continue
+        book[position] = (bitboard.best_move(x, o), bitboard.value(x, o))
+    return book
+
+
+def write(book, path=BOOK_FILE):
+    with open(path, "wb") as f:
+        for position in sorted(book):
+            cell, value = book[position]
+            f.write(struct.pack("<I", position << 8 | cell << 2 | value + 1))
+
+
+def load(path=BOOK_FILE):
+    """
+    Reads the book written by write(). Returns an empty book if there is no file.
+    """
+    book = {}
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return book
+    for (entry,) in struct.iter_unpack("<I", data):
+        book[entry >> 8] = (entry >> 2 & 0b1111, (entry & 0b11) - 1)
+    return book
+
+
+def lookup(book, x, o):
+    """
+    Returns (cell, value for X) for the position (x, o) with cell in the
+    frame of (x, o), or None if the book doesn't have it.
+    """
+    position, perm = canonical(x, o)
+    if position not in book:
+        return None
+    cell, value = book[position]
+    return perm.index(cell), value
+
+
+def verify(book, minimax):
+    """
+    Checks a minimax(board) function against the book: its move must keep
+    the book's value in every position. Returns the number of wrong moves.
+    """
+    wrong = 0
+    for position, (_, value) in book.items():
+        x, o = decode(position)
+        board = [["X" if x >> (3 * i + j) & 1 else "O" if o >> (3 * i + j) & 1 else None
+                  for j in range(3)] for i in range(3)]
+        i, j = minimax(board)
+        cell = 3 * i + j
+        after = (x | 1 << cell, o) if bitboard.x_to_move(x, o) else (x, o | 1 << cell)
+        if bitboard.value(*after) != value:
+            wrong += 1
+    return wrong
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--verify":
+        import tictactoe
+        book = load()
+        wrong = verify(book, tictactoe.minimax)
+        print(f"{len(book)} positions checked, {wrong} wrong moves.")
+        return
+
+    book = build()
+    write(book)
+    print(f"{len(canonical_positions())} canonical positions, "
+          f"{len(book)} non-terminal written to {BOOK_FILE}.")
+
+
+if __name__ == "__main__":
+    main()
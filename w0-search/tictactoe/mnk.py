@@ -0,0 +1,271 @@
+"""
+m,n,k-game player (Tic Tac Toe, Gomoku and friends)
+"""
+
+import random
+import threading
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# score of a won position, shortened by the number of plies to reach it
+WIN = 10 ** 12
+
+# the four line directions: row, column and both diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def window_evaluation(grid, player, k):
+    """
+    Default heuristic: every length-k window that only one player occupies
+    scores 10 ** (stones in it) for that player. Returns the score from
+    player's point of view.
+    """
+    other = O if player == X else X
+    rows, cols = len(grid), len(grid[0])
+    score = 0
+    for i in range(rows):
+        for j in range(cols):
+            for di, dj in DIRECTIONS:
+                end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                if not (0 <= end_i < rows and 0 <= end_j < cols):
+                    continue
+                mine = theirs = 0
+                for step in range(k):
+                    cell = grid[i + step * di][j + step * dj]
+                    if cell == player:
+                        mine += 1
+                    elif cell == other:
+                        theirs += 1
+                if theirs == 0 and mine:
+                    score += 10 ** mine
+                elif mine == 0 and theirs:
+                    score -= 10 ** theirs
+    return score
+
+
+class Game():
+    """
+    An m x n board where the first player with k marks in a row wins.
+
+    Offers the same functions as the tictactoe module (initial_state, player,
+    actions, result, winner, terminal, utility, minimax), so runner.py can
+    play either. minimax runs alpha-beta search with iterative deepening
+    until time_limit seconds are used, scoring unfinished positions with
+    evaluate(grid, player, k) (window_evaluation by default).
+    """
+
+    def __init__(self, m=3, n=3, k=3, time_limit=1.0, evaluate=window_evaluation, radius=1):
+        self.m = m
+        self.n = n
+        self.k = k
+        self.time_limit = time_limit
+        self.evaluate = evaluate
+        # only cells within radius of a mark are searched on big boards
+        self.radius = radius
+
+        # zobrist keys for the transposition table
+        rng = random.Random(0)
+        self.keys = {(i, j, p): rng.getrandbits(64)
+                     for i in range(m) for j in range(n) for p in (X, O)}
+        self.table = {}
+
+        # statistics of the last minimax call
+        self.nodes = 0
+        self.depth = 0
+        # event that stops the running minimax call, see minimax
+        self.cancelled = None
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        move_count = sum(cell is not EMPTY for row in board for cell in row)
+        return X if move_count % 2 == 0 else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        if self.terminal(board):
+            return None
+        return {(i, j) for i in range(self.m) for j in range(self.n) if board[i][j] is EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] is not EMPTY:
+            raise ValueError(f"cell {action} is taken")
+        new_board = [list(row) for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        for i in range(self.m):
+            for j in range(self.n):
+                if board[i][j] is not EMPTY and self.wins(board, i, j):
+                    return board[i][j]
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        if self.winner(board) is not None:
+            return True
+        return all(cell is not EMPTY for row in board for cell in row)
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        w = self.winner(board)
+        return 1 if w == X else -1 if w == O else 0
+
+    def wins(self, grid, i, j):
+        """
+        Returns True if the mark at (i, j) is part of k in a row.
+        """
+        p = grid[i][j]
+        for di, dj in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                a, b = i + sign * di, j + sign * dj
+                while 0 <= a < self.m and 0 <= b < self.n and grid[a][b] == p:
+                    count += 1
+                    a, b = a + sign * di, b + sign * dj
+            if count >= self.k:
+                return True
+        return False
+
+    def candidates(self, grid):
+        """
+        Returns the empty cells worth searching, closest to the center first.
+        """
+        empty = [(i, j) for i in range(self.m) for j in range(self.n) if grid[i][j] is EMPTY]
+        if self.m * self.n > 16:
+            near = [(i, j) for i, j in empty
+                    if any(grid[a][b] is not EMPTY
+                           for a in range(max(0, i - self.radius), min(self.m, i + self.radius + 1))
+                           for b in range(max(0, j - self.radius), min(self.n, j + self.radius + 1)))]
+            if near:
+                empty = near
+        center_i, center_j = (self.m - 1) / 2, (self.n - 1) / 2
+        empty.sort(key=lambda cell: abs(cell[0] - center_i) + abs(cell[1] - center_j))
+        return empty
+
+    def minimax(self, board, cancelled=None):
+        """
+        Returns the best action found for the current player on the board
+        within the time limit. Setting the threading.Event cancelled (from
+        another thread, even before the search starts) makes it return early.
+        """
+        if self.terminal(board):
+            return None
+
+        grid = [list(row) for row in board]
+        player = self.player(board)
+        key = 0
+        for i in range(self.m):
+            for j in range(self.n):
+                if grid[i][j] is not EMPTY:
+                    key ^= self.keys[(i, j, grid[i][j])]
+
+        self.nodes = 0
+        self.depth = 0
+        self.cancelled = cancelled if cancelled is not None else threading.Event()
+        self.deadline = time.perf_counter() + self.time_limit
+        empties = sum(cell is EMPTY for row in grid for cell in row)
+        best = self.candidates(grid)[0]
+
+        # deepen one ply at a time, keeping the last fully searched answer
+        for depth in range(1, empties + 1):
+            try:
+                value, move = self.search(grid, key, player, depth, -WIN - 1, WIN + 1, 0)
+            except SearchTimeout:
+                break
+            best = move
+            self.depth = depth
+            # a forced result can't change with more depth
+            if abs(value) >= WIN - empties:
+                break
+        return best
+
+    def search(self, grid, key, player, depth, alpha, beta, ply):
+        """
+        Negamax alpha-beta search. Returns (value for player, best move).
+        """
+        self.nodes += 1
+        if self.cancelled.is_set() or time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        original_alpha = alpha
+        entry = self.table.get(key)
+        hint = None
+        if entry is not None:
+            entry_depth, value, flag, hint = entry
+            if entry_depth >= depth and ply > 0:
+                if flag == EXACT:
+                    return value, hint
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                elif flag == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, hint
+
+        moves = self.candidates(grid)
+        if not moves:
+            return 0, None
+        if depth == 0:
+            return self.evaluate(grid, player, self.k), None
+
+        # try the best move of an earlier search first
+        if hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+
+        other = O if player == X else X
+        best_value, best_move = -WIN - 1, moves[0]
+        for i, j in moves:
+            grid[i][j] = player
+            if self.wins(grid, i, j):
+                value = WIN - ply - 1
+            else:
+                value = -self.search(grid, key ^ self.keys[(i, j, player)], other,
+                                     depth - 1, -beta, -alpha, ply + 1)[0]
+            grid[i][j] = EMPTY
+
+            if value > best_value:
+                best_value, best_move = value, (i, j)
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        flag = EXACT
+        if best_value <= original_alpha:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        self.table[key] = (depth, best_value, flag, best_move)
+        return best_value, best_move
@@ -1,8 +1,20 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import tictactoe as ttt
+import mnk
+
+# python runner.py [m n k [seconds]] plays on an m x n board with k in a row
+if len(sys.argv) > 1:
+    rows, cols, k = (int(arg) for arg in sys.argv[1:4])
+    seconds = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
+    game = mnk.Game(rows, cols, k, time_limit=seconds)
+else:
+    rows, cols = 3, 3
+    game = ttt
 
 pygame.init()
 size = width, height = 600, 400
@@ -15,16 +27,36 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+# fit the board below the title and above the button
+tile_size = min(80, (height - 140) // rows, (width - 40) // cols)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = game.initial_state()
+
+# the AI searches on a worker thread while the loop keeps drawing
+executor = ThreadPoolExecutor(max_workers=1)
+ai_future = None
+# set to stop the search of ai_future, made anew for every search
+ai_cancelled = threading.Event()
+
+
+def cancel_ai():
+    """Drops the running AI search, stopping it if the engine supports that."""
+    global ai_future
+    if ai_future is not None:
+        ai_future.cancel()
+        ai_cancelled.set()
+        ai_future = None
+
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            cancel_ai()
+            executor.shutdown(wait=False)
             sys.exit()
 
     screen.fill(black)
@@ -67,13 +99,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (cols / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(cols):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,12 +120,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
+        game_over = game.terminal(board)
+        player = game.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = game.winner(board)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -102,32 +133,37 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = "." * (int(time.time() * 3) % 4)
+            title = f"Computer thinking{dots:<3}"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move: start a search, or play its move once it's done
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_future is None:
+                ai_cancelled = threading.Event()
+                if game is ttt:
+                    ai_future = executor.submit(game.minimax, board)
+                else:
+                    ai_future = executor.submit(game.minimax, board, ai_cancelled)
+            elif ai_future.done():
+                move = ai_future.result()
+                ai_future = None
+                board = game.result(board, move)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(cols):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
+                        board = game.result(board, (i, j))
 
-        if game_over:
+        # Play Again also cancels a search in progress
+        if game_over or ai_future is not None:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
             again = mediumFont.render("Play Again", True, black)
             againRect = again.get_rect()
@@ -139,8 +175,8 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
+                    cancel_ai()
                     user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    board = game.initial_state()
 
     pygame.display.flip()
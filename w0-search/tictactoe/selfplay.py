@@ -0,0 +1,111 @@
+"""
+Headless Tic Tac Toe self-play benchmark
+"""
+
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import tictactoe as ttt
+
+# Agents are named on the command line:
+#   minimax   tictactoe.minimax (opening book, then full search)
+#   search    full search without the opening book or transposition table
+#   random    a random legal move
+#   depthN    search looking at most N moves ahead, e.g. depth2
+
+
+def make_agent(name, rng):
+    """
+    Returns a function board -> action for the named agent.
+    """
+    if name == "minimax":
+        return ttt.minimax
+    if name == "search":
+        def search(board):
+            bitboard.table.clear()
+            cell = bitboard.best_move(*bitboard.encode(board, ttt.X, ttt.O))
+            return divmod(cell, 3)
+        return search
+    if name == "random":
+        return lambda board: rng.choice(sorted(ttt.actions(board)))
+    if name.startswith("depth") and name[5:].isdigit():
+        depth = int(name[5:])
+        return lambda board: divmod(
+            bitboard.limited_move(*bitboard.encode(board, ttt.X, ttt.O), depth), 3)
+    raise ValueError(f"unknown agent '{name}'")
+
+
+def play_games(x_name, o_name, games, seed):
+    """
+    Plays games between the agents and returns their statistics:
+    outcomes, moves, nodes searched and seconds spent per agent.
+    """
+    rng = random.Random(seed)
+    agents = {ttt.X: make_agent(x_name, rng), ttt.O: make_agent(o_name, rng)}
+    stats = {
+        "outcomes": Counter(),
+        "moves": Counter(),
+        "nodes": Counter(),
+        "seconds": Counter()
+    }
+    for _ in range(games):
+        board = ttt.initial_state()
+        while not ttt.terminal(board):
+            player = ttt.player(board)
+            nodes = bitboard.nodes
+            start = time.perf_counter()
+            action = agents[player](board)
+            stats["seconds"][player] += time.perf_counter() - start
+            stats["nodes"][player] += bitboard.nodes - nodes
+            stats["moves"][player] += 1
+            board = ttt.result(board, action)
+        stats["outcomes"][ttt.winner(board) or "tie"] += 1
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-x", type=str, help="agent playing X", default="minimax")
+    parser.add_argument("-o", type=str, help="agent playing O", default="random")
+    parser.add_argument("-n", type=int, help="number of games", default=1000)
+    parser.add_argument("-p", type=int, help="worker processes (default: cpu count)", default=None)
+    parser.add_argument("--seed", type=int, help="random seed", default=0)
+    args = parser.parse_args()
+
+    # validate agent names before starting workers
+    for name in (args.x, args.o):
+        make_agent(name, random.Random())
+
+    start = time.perf_counter()
+    workers = args.p or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = [args.n // workers + (i < args.n % workers) for i in range(workers)]
+        futures = [pool.submit(play_games, args.x, args.o, games, args.seed + i)
+                   for i, games in enumerate(chunks) if games]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    total = {key: Counter() for key in results[0]}
+    for stats in results:
+        for key, counter in stats.items():
+            total[key].update(counter)
+
+    print(f"{args.n} games of {args.x} (X) vs {args.o} (O) in {elapsed:.2f}s, "
+          f"{args.n / elapsed:.1f} games/sec")
+    for outcome in (ttt.X, ttt.O, "tie"):
+        count = total["outcomes"][outcome]
+        label = f"{outcome} wins" if outcome != "tie" else "ties"
+        print(f"  {label:<7} {count:8} ({100 * count / args.n:.1f}%)")
+    for player, name in ((ttt.X, args.x), (ttt.O, args.o)):
+        moves = total["moves"][player] or 1
+        print(f"  {player} ({name}): {total['nodes'][player] / moves:.1f} nodes/move, "
+              f"{total['seconds'][player] / moves * 1000:.3f} ms/move")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,16 @@
 Tic Tac Toe Player
 """
 
-import re
-import copy
+import bitboard
+import book
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# symmetry-reduced table of solved positions, see book.py
+opening_book = book.load()
+
 
 def initial_state():
     """
@@ -23,26 +26,20 @@ def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    # count filled fields (i.e., moves made)
-    move_count = count_moves(board)
     # assumes X always makes the first move
-    return X if move_count % 2 == 0 else O
+    return X if bitboard.x_to_move(*bitboard.encode(board, X, O)) else O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    if terminal(board):
+    x, o = bitboard.encode(board, X, O)
+    if bitboard.terminal(x, o):
         return None
 
     # determine empty fields
-    actions = set()
-    for row in range(3):
-        for cell in range(3):
-            if board[row][cell] == None:
-                actions.add((row, cell))
-    return actions
+    return {divmod(cell, 3) for cell in bitboard.moves(x, o)}
 
 
 def result(board, action):
@@ -50,7 +47,7 @@ def result(board, action):
     Returns the board that results from making move (i, j) on the board.
     """
     p = player(board) # determine the current player
-    new_b = copy.deepcopy(board)
+    new_b = [list(row) for row in board]
     new_b[action[0]][action[1]] = p
     return new_b
 
@@ -59,21 +56,20 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    # get stringified version of board
-    board_str = ''
-    for row in board:
-        for cell in row:
-            board_str += cell if cell else ' '
-
-    # call memoized function
-    return find_winner(board_str)
+    x, o = bitboard.encode(board, X, O)
+    if bitboard.has_won(x):
+        return X
+    elif bitboard.has_won(o):
+        return O
+    else:
+        return None
 
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    return True if winner(board) or count_moves(board) == 9 else False
+    return bitboard.terminal(*bitboard.encode(board, X, O))
 
 
 def utility(board):
@@ -93,69 +89,16 @@ def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
-    # determine which player is the ai
-    ai_p = player(board)
-
-    # function to determine the max score of an action of the ai player
-    def get_score(maximize, b):
-        # if the game's over, return the utility for the ai player
-        if terminal(b):
-            u = utility(b) # returns utility for X (1, 0, or -1)
-            return u if ai_p == X else -u # returns utility for ai player
-
-        # get max score
-        scores = set()
-        for a in actions(b):
-            # alpha-beta pruning
-            if maximize:
-                if 1 in scores: 
-                    break
-            else:
-                if -1 in scores:
-                    break
-            # get result of next action and add scores recursively
-            r = result(b, a)
-            scores.add(get_score(not maximize, r))
-
-        # return max() if maximize player, else min() of scores
-        return max(scores) if maximize else min(scores)
-
-    optimal_action = None
-    optimal_score = -2
-
-    for a in actions(board):
-        r = result(board, a)
-        score = get_score(False, r)
-        if score > optimal_score:
-            optimal_score = score
-            optimal_action = a
-
-    return optimal_action
-
-
-def find_winner(board_str):
-    # pattern match to find winner
-    ## winning patterns
-    win = [
-        '^t{3}', # 1st row
-        '^.{3}t{3}', # 2nd row
-        '^.{6}t{3}', # 3rd row
-        '^(t{1}.{2}){3}', # 1st column
-        '^(.{1}t{1}.{1}){3}', # 2nd column
-        '^(.{2}t{1}){3}', # 3rd column
-        '^(t{1}.{3}){2}t{1}', # diagonal left to right
-        '^.{2}(t{1}.{1}){3}.{1}', # diagonal right to left
-    ]
-    ## prepare str for X and O win searches (t represents the respective player)
-    str_x = board_str.replace('X', 't')
-    str_o = board_str.replace('O', 't')
-    ## find winner and return letter or None
-    if any(re.search(w, str_x) for w in win):
-        return X
-    elif any(re.search(w, str_o) for w in win):
-        return O
-    else:
-        return None
+    x, o = bitboard.encode(board, X, O)
+
+    # look the position up in the opening book first
+    entry = book.lookup(opening_book, x, o)
+    if entry is not None:
+        return divmod(entry[0], 3)
+
+    # else solve it, positions are kept in the bitboard transposition table
+    cell = bitboard.best_move(x, o)
+    return None if cell is None else divmod(cell, 3)
 
 
 def count_moves(board):
@@ -164,4 +107,4 @@ def count_moves(board):
         for cell in row:
             if cell:
                 move_count += 1
-    return move_count
\ No newline at end of file
+    return move_count
@@ -0,0 +1,96 @@
+"""
+Batch solver for Knights and Knaves puzzle files
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import knaves
+from sat import KnowledgeBase
+
+
+def solve(puzzle, limit):
+    """
+    Solves a puzzle. Returns its statistics: solve time, number of solutions
+    (distinct knight/knave assignments, at most limit), whether the solution
+    is unique, solver conflicts and the solution if it is unique.
+    """
+    start = time.perf_counter()
+    knowledge, _ = knaves.compile_puzzle(puzzle)
+    kb = KnowledgeBase(knowledge)
+    characters = puzzle["characters"]
+    knights = [knaves.symbol(character, "Knight") for character in characters]
+    solutions = list(kb.models(knights, limit))
+    stats = {
+        "name": puzzle.get("name"),
+        "seconds": time.perf_counter() - start,
+        "models": len(solutions),
+        "unique": len(solutions) == 1,
+        "conflicts": kb.solver.conflicts,
+        "solution": None
+    }
+    if stats["unique"]:
+        stats["solution"] = {character: "Knight" if solutions[0][knight] else "Knave"
+                             for character, knight in zip(characters, knights)}
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file", nargs="?", help="puzzle file (.json list or .jsonl)",
+                        default="puzzles.json")
+    parser.add_argument("-g", type=int, help="solve this many random puzzles instead", default=None)
+    parser.add_argument("-c", type=int, help="characters per random puzzle", default=8)
+    parser.add_argument("-s", type=int, help="statements per random puzzle", default=8)
+    parser.add_argument("-l", type=int, help="max solutions enumerated per puzzle", default=1000)
+    parser.add_argument("-p", type=int, help="worker processes (default: cpu count)", default=None)
+    parser.add_argument("-v", action="store_true", help="print every puzzle's result")
+    parser.add_argument("--seed", type=int, help="random seed", default=0)
+    args = parser.parse_args()
+
+    if args.g is not None:
+        rng = random.Random(args.seed)
+        puzzles = [knaves.random_puzzle(rng, args.c, args.s, name=f"Random {i}")
+                   for i in range(args.g)]
+    else:
+        puzzles = knaves.load(args.file)
+    if not puzzles:
+        raise SystemExit("no puzzles")
+
+    # fail on a malformed puzzle before starting workers
+    for puzzle in puzzles:
+        knaves.compile_puzzle(puzzle)
+
+    start = time.perf_counter()
+    workers = args.p or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(puzzles) // (4 * workers))
+        results = list(pool.map(partial(solve, limit=args.l), puzzles, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    if args.v:
+        for stats in results:
+            print(json.dumps(stats))
+
+    unique = sum(stats["unique"] for stats in results)
+    unsolvable = sum(stats["models"] == 0 for stats in results)
+    capped = sum(stats["models"] >= args.l for stats in results)
+    times = sorted(stats["seconds"] for stats in results)
+    print(f"{len(results)} puzzles in {elapsed:.2f}s with {workers} workers, "
+          f"{len(results) / elapsed:.1f} puzzles/sec")
+    print(f"  unique solution      {unique:8}")
+    print(f"  several solutions    {len(results) - unique - unsolvable:8}"
+          + (f" ({capped} stopped at {args.l})" if capped else ""))
+    print(f"  no solution          {unsolvable:8}")
+    print(f"  models enumerated    {sum(stats['models'] for stats in results):8}")
+    print(f"  solve time           {1000 * sum(times) / len(times):.3f} ms mean, "
+          f"{1000 * times[len(times) // 2]:.3f} ms median, {1000 * times[-1]:.3f} ms max")
+
+
+if __name__ == "__main__":
+    main()
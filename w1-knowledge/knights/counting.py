@@ -0,0 +1,224 @@
+"""
+Model counting over logical knowledge bases
+"""
+
+from collections import Counter
+
+from sat import Encoder
+
+
+class CNF():
+    """
+    Collects the clauses of an Encoder without solving them.
+    Clauses are sorted tuples of literals.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.clauses = []
+
+    def new_variable(self):
+        self.n += 1
+        return self.n
+
+    def add_clause(self, literals):
+        clause = tuple(sorted(set(literals)))
+        # tautologies constrain nothing
+        if not any(-literal in clause for literal in clause if literal > 0):
+            self.clauses.append(clause)
+
+
+def propagate(clauses, literals):
+    """
+    Sets literals true and unit propagates.
+    Returns (remaining clauses, set of true literals), or (None, None) on a conflict.
+    """
+    true = set()
+    pending = list(literals)
+    while True:
+        for literal in pending:
+            if -literal in true:
+                return None, None
+            true.add(literal)
+        pending = []
+        remaining = []
+        for clause in clauses:
+            if any(literal in true for literal in clause):
+                continue
+            reduced = tuple(literal for literal in clause if -literal not in true)
+            if not reduced:
+                return None, None
+            if len(reduced) == 1:
+                pending.append(reduced[0])
+            else:
+                remaining.append(reduced)
+        clauses = remaining
+        if not pending:
+            return clauses, true
+
+
+def components(clauses):
+    """Splits clauses into groups that share no variables."""
+    parent = {}
+
+    def find(variable):
+        root = variable
+        while parent[root] != root:
+            root = parent[root]
+        while parent[variable] != root:
+            parent[variable], variable = root, parent[variable]
+        return root
+
+    for clause in clauses:
+        first = find(parent.setdefault(abs(clause[0]), abs(clause[0])))
+        for literal in clause[1:]:
+            other = find(parent.setdefault(abs(literal), abs(literal)))
+            if other != first:
+                parent[other] = first
+
+    groups = {}
+    for clause in clauses:
+        groups.setdefault(find(abs(clause[0])), []).append(clause)
+    return list(groups.values())
+
+
+def run(task):
+    """
+    Runs a generator that yields the generators whose results it needs,
+    and returns its result. The pending generators are kept on a list,
+    so how deep they nest isn't limited by Python's recursion limit.
+    """
+    stack = [task]
+    result = None
+    while stack:
+        try:
+            subtask = stack[-1].send(result)
+        except StopIteration as stop:
+            stack.pop()
+            result = stop.value
+        else:
+            stack.append(subtask)
+            result = None
+    return result
+
+
+class ModelCounter():
+    """
+    Counts the models of a knowledge base, and for every symbol how many
+    of them make it true.
+
+    The knowledge base is encoded into CNF once. A DPLL search then
+    counts it, splitting the remaining clauses into independent components
+    whose counts multiply, and caching the count of every component it
+    meets. Each count carries the per-variable counts of true models, so a
+    single search gives the marginals and status of every symbol. The
+    search runs on an explicit stack (see run), as it branches once per
+    level and a long chain of clauses makes it as deep as the chain.
+    """
+
+    def __init__(self, knowledge):
+        cnf = CNF()
+        self.encoder = Encoder(cnf)
+        self.encoder.assert_sentence(knowledge)
+        for name in knowledge.symbols():
+            self.encoder.variable(name)
+        # component (frozenset of clauses) -> (count, variable -> true count)
+        self.cache = {}
+        # Tseitin variables are fixed by the symbols, so counting all
+        # variables counts assignments to the symbols of the knowledge base
+        self.total, self.true_counts = run(self.count_clauses(cnf.clauses, range(1, cnf.n + 1)))
+
+    def count_clauses(self, clauses, variables, literals=()):
+        """
+        Counts the assignments to variables (which include every variable
+        of clauses) that satisfy clauses with literals set true.
+        A generator for run(), returning
+        (count, dict variable -> count of those where it is true).
+        """
+        clauses, true = propagate(clauses, literals)
+        if clauses is None:
+            return 0, dict.fromkeys(variables, 0)
+
+        total = 1
+        counted = []
+        mentioned = set()
+        for component in components(clauses):
+            key = frozenset(component)
+            if key not in self.cache:
+                self.cache[key] = yield self.count_component(component)
+            count, true_counts = self.cache[key]
+            if count == 0:
+                return 0, dict.fromkeys(variables, 0)
+            total *= count
+            counted.append((count, true_counts))
+            mentioned.update(true_counts)
+
+        free = [variable for variable in variables
+                if variable not in mentioned and variable not in true and -variable not in true]
+        total <<= len(free)
+
+        true_counts = {}
+        for count, component_counts in counted:
+            # every model of a component combines with total // count others
+            scale = total // count
+            for variable, true_count in component_counts.items():
+                true_counts[variable] = true_count * scale
+        for variable in free:
+            true_counts[variable] = total >> 1
+        for literal in true:
+            true_counts[abs(literal)] = total if literal > 0 else 0
+        return total, true_counts
+
+    def count_component(self, clauses):
+        """
+        Counts connected clauses by branching on their most frequent
+        variable. A generator for run(), like count_clauses.
+        """
+        occurrences = Counter(abs(literal) for clause in clauses for literal in clause)
+        variable = max(occurrences, key=occurrences.get)
+        high, high_counts = yield self.count_clauses(clauses, occurrences, [variable])
+        low, low_counts = yield self.count_clauses(clauses, occurrences, [-variable])
+        return high + low, {v: high_counts[v] + low_counts[v] for v in occurrences}
+
+    def count(self, symbol):
+        """
+        Returns the number of models of the knowledge base where symbol
+        (one of its symbols) is true.
+        """
+        variable = self.encoder.variables.get(symbol.name)
+        if variable is None:
+            raise ValueError(f"{symbol} is not in the knowledge base")
+        return self.true_counts[variable]
+
+    def probability(self, symbol):
+        """
+        Returns the fraction of models where symbol is true, or None if the
+        knowledge base has no models.
+        """
+        if self.total == 0:
+            return None
+        if symbol.name not in self.encoder.variables:
+            # a symbol the knowledge base doesn't mention is true in half of them
+            return 0.5
+        return self.count(symbol) / self.total
+
+    def status(self, symbol):
+        """
+        Returns True if symbol is entailed, False if its negation is,
+        None if neither is known.
+        """
+        if self.total == 0:
+            # everything follows from an inconsistent knowledge base
+            return True
+        if symbol.name not in self.encoder.variables:
+            return None
+        count = self.count(symbol)
+        if count == self.total:
+            return True
+        if count == 0:
+            return False
+        return None
+
+    def backbone(self, symbols):
+        """Returns a dict symbol -> status(symbol), like KnowledgeBase.backbone."""
+        return {symbol: self.status(symbol) for symbol in symbols}
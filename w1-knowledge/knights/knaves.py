@@ -0,0 +1,141 @@
+"""
+Declarative Knights and Knaves puzzles
+"""
+
+import json
+import re
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# A puzzle is a JSON object:
+#
+#   {"name": "Puzzle 2",
+#    "characters": ["A", "B"],
+#    "statements": [{"speaker": "A", "says": STATEMENT}, ...]}
+#
+# A statement entry can also be {"fact": STATEMENT}, something known to be
+# true that nobody says.
+#
+# A STATEMENT is either a string "<character> is a knight" (or knave), or an
+# object with a single key:
+#
+#   {"not": S}  {"and": [S, ...]}  {"or": [S, ...]}
+#   {"implies": [S, S]}  {"iff": [S, S]}  {"says": ["<character>", S]}
+#
+# {"says": [X, S]} is the claim "X says S", which holds if X is a knight
+# and S is true, or X is a knave and S is false.
+# Puzzle files hold a JSON list of puzzles, or one puzzle per line (.jsonl).
+
+KINDS = ("Knight", "Knave")
+
+ATOM = re.compile(r"^\s*(\S+)\s+is\s+an?\s+(knight|knave)\s*$", re.IGNORECASE)
+
+
+def symbol(character, kind):
+    """Returns the symbol "<character> is a <kind>", as puzzle.py names them."""
+    return Symbol(f"{character} is a {kind}")
+
+
+def compile_statement(statement, characters):
+    """Returns the Sentence of a STATEMENT about the given characters."""
+    if isinstance(statement, str):
+        match = ATOM.match(statement)
+        if match is None:
+            raise ValueError(f"can't read statement '{statement}'")
+        character, kind = match.group(1), match.group(2).capitalize()
+        if character not in characters:
+            raise ValueError(f"unknown character '{character}'")
+        return symbol(character, kind)
+
+    if not isinstance(statement, dict) or len(statement) != 1:
+        raise ValueError(f"can't read statement {statement!r}")
+    (operator, operands), = statement.items()
+
+    if operator == "not":
+        return Not(compile_statement(operands, characters))
+    if operator == "says":
+        speaker, claim = operands
+        if speaker not in characters:
+            raise ValueError(f"unknown character '{speaker}'")
+        return Biconditional(symbol(speaker, "Knight"), compile_statement(claim, characters))
+
+    parts = [compile_statement(operand, characters) for operand in operands]
+    if operator == "and":
+        return And(*parts)
+    if operator == "or":
+        return Or(*parts)
+    if operator in ("implies", "iff") and len(parts) == 2:
+        return Implication(*parts) if operator == "implies" else Biconditional(*parts)
+    raise ValueError(f"can't read statement {statement!r}")
+
+
+def compile_puzzle(puzzle):
+    """
+    Returns (knowledge, symbols) of a puzzle: the conjunction of the game
+    rules and every statement, and the knight and knave symbol of every
+    character.
+    """
+    characters = puzzle["characters"]
+    if len(set(characters)) != len(characters):
+        raise ValueError("character names must be unique")
+
+    symbols = []
+    knowledge = []
+    for character in characters:
+        knight, knave = (symbol(character, kind) for kind in KINDS)
+        symbols.extend((knight, knave))
+        # every character is exactly one of a knight and a knave
+        knowledge.append(Or(knight, knave))
+        knowledge.append(Not(And(knight, knave)))
+
+    for statement in puzzle.get("statements", []):
+        if "fact" in statement:
+            knowledge.append(compile_statement(statement["fact"], characters))
+            continue
+        speaker = statement["speaker"]
+        if speaker not in characters:
+            raise ValueError(f"unknown character '{speaker}'")
+        # knights tell the truth, knaves lie
+        knowledge.append(Biconditional(symbol(speaker, "Knight"),
+                                       compile_statement(statement["says"], characters)))
+    return And(*knowledge), symbols
+
+
+def load(path):
+    """Reads a list of puzzles from a puzzle file."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        puzzles = json.load(f)
+    return puzzles if isinstance(puzzles, list) else [puzzles]
+
+
+def character_names(count):
+    """Returns count character names: A to Z, then A1, B1, ..."""
+    letters = [chr(ord("A") + i) for i in range(26)]
+    return [letters[i % 26] + (str(i // 26) if i >= 26 else "") for i in range(count)]
+
+
+def random_statement(rng, characters, depth):
+    """Returns a random STATEMENT of at most depth nested operators."""
+    if depth == 0 or rng.random() < 0.3:
+        return f"{rng.choice(characters)} is a {rng.choice(KINDS).lower()}"
+    operator = rng.choice(("not", "and", "or", "implies", "iff", "says"))
+    if operator == "not":
+        return {"not": random_statement(rng, characters, depth - 1)}
+    if operator == "says":
+        return {"says": [rng.choice(characters), random_statement(rng, characters, depth - 1)]}
+    count = rng.randint(2, 3) if operator in ("and", "or") else 2
+    return {operator: [random_statement(rng, characters, depth - 1) for _ in range(count)]}
+
+
+def random_puzzle(rng, characters, statements, depth=2, name=None):
+    """Returns a random puzzle with the given numbers of characters and statements."""
+    names = character_names(characters)
+    return {
+        "name": name,
+        "characters": names,
+        "statements": [{"speaker": rng.choice(names),
+                        "says": random_statement(rng, names, depth)}
+                       for _ in range(statements)]
+    }
@@ -1,4 +1,5 @@
 from logic import *
+from sat import KnowledgeBase
 
 AKnight = Symbol("A is a Knight")
 AKnave = Symbol("A is a Knave")
@@ -118,8 +119,10 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            # compile the puzzle once and ask about every symbol at once
+            known = KnowledgeBase(knowledge).backbone(symbols)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if known[symbol]:
                     print(f"    {symbol}")
 
 
@@ -1,4 +1,5 @@
 import random
+from collections import deque
 
 
 class Minesweeper():
@@ -134,6 +135,11 @@ class Sentence():
 class MinesweeperAI():
     """
     Minesweeper game player
+
+    Knowledge is a set of frozen sentences (frozenset of cells, count)
+    indexed by cell. Marking a cell only rewrites the sentences mentioning
+    it, and inferences are drawn from a worklist of new sentences, each
+    compared only with the sentences sharing a cell with it.
     """
 
     def __init__(self, height=8, width=8):
@@ -148,30 +154,33 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # known safe cells that have not been clicked on yet
+        self.safe_moves = set()
+
+        # Set of sentences about the game known to be true
+        self.knowledge = set()
+
+        # cell -> sentences in knowledge mentioning it
+        self.sentences_of = {}
+
+        # sentences whose inferences are still to be drawn
+        self.pending = deque()
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
-        self.clean_up_sentences()
-        self.draw_basic_inferences()
+        self.assign(cell, True)
+        self.propagate()
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
-        self.clean_up_sentences()
-        self.draw_basic_inferences()
+        self.assign(cell, False)
+        self.propagate()
 
     def add_knowledge(self, cell, count):
         """
@@ -189,15 +198,12 @@ class MinesweeperAI():
                if they can be inferred from existing knowledge
         """
 
-        print('safe moves not made: ', self.get_safe_moves_count())
-        print('mines founds: ', self.get_mines_count())
-        print()
-
         # mark the cell as a move that has been made
         self.moves_made.add(cell)
+        self.safe_moves.discard(cell)
 
         # mark the cell as safe
-        self.mark_safe(cell)
+        self.assign(cell, False)
 
         # add a new sentence to the AI's KB
         cells = set()
@@ -215,69 +221,83 @@ class MinesweeperAI():
                         # if mine already registred, decrease mine count
                         elif c in self.mines:
                             count -= 1
-        if len(cells):
-            self.knowledge.append(Sentence(cells, count))
+        self.add_sentence(cells, count)
 
-        # draw basic inferences and inferences based on finding subsets
-        self.draw_basic_inferences()
-        self.draw_subset_inferences()
-        
+        # draw every inference the new knowledge allows
+        self.propagate()
 
     get_mines_count = lambda self: len(self.mines)
 
-    get_safe_moves_count = lambda self: len(self.safes) - len(self.moves_made)
+    get_safe_moves_count = lambda self: len(self.safe_moves)
 
-    def draw_basic_inferences(self):
-        # this function will be called whenever mark_safe or mark_mine are called
-        # (to ensure all possible inferences were drawn, one by one)
-        for sentence in self.knowledge:
-            # no mines in the sentence -> mark as safe
-            if sentence.count == 0:
-                for c in sentence.cells:
-                    if c not in self.safes:
-                        self.mark_safe(c)
-                        break
-            # as many cells as mines -> mark as mine
-            if len(sentence.cells) == sentence.count:
-                for c in sentence.cells:
-                    if c not in self.mines:
-                        self.mark_mine(c)
-                        break
-
-    def draw_subset_inferences(self):
-        # record state before
-        mcb = self.get_mines_count()
-        smcb = self.get_safe_moves_count()
-
-        # find subsets and add new logic accordingly
-        new_sentences = list()
-        for s1 in self.knowledge:
-            for s2 in self.knowledge:
-                if s1 != s2:
-                    if s1.cells.issubset(s2.cells):
-                        cells = s2.cells.difference(s1.cells)
-                        count = s2.count - s1.count
-                        new_s = Sentence(cells, count)
-                        if new_s not in self.knowledge:
-                            new_sentences.append(new_s)
-        if len(new_sentences):
-            [self.knowledge.append(new_s) for new_s in new_sentences]
-            # if new knowledge was added, re-try finding basic inferences
-            self.draw_basic_inferences()
-        
-            # if state changed, re-execute draw_subset_inferences
-            if self.get_mines_count() != mcb or self.get_safe_moves_count() != smcb:
-                self.draw_subset_inferences()
-
-    def clean_up_sentences(self):
-        for [i1, s1] in enumerate(self.knowledge):
-            # remove empty sentences
-            if s1.count == 0 and len(s1.cells) == 0:
-                self.knowledge.remove(s1)
-            # remove duplicates 
-            for [i2, s2] in enumerate(self.knowledge):
-                if i1 != i2 and s1 == s2:
-                    self.knowledge.remove(s1)
+    def assign(self, cell, mine):
+        """
+        Records that a cell is a mine (or safe) and rewrites the sentences
+        mentioning it without it. Inferences are left to propagate().
+        """
+        known = self.mines if mine else self.safes
+        if cell in known:
+            return
+        known.add(cell)
+        if not mine and cell not in self.moves_made:
+            self.safe_moves.add(cell)
+        for sentence in list(self.sentences_of.get(cell, ())):
+            self.remove_sentence(sentence)
+            cells, count = sentence
+            self.add_sentence(cells - {cell}, count - 1 if mine else count)
+
+    def add_sentence(self, cells, count):
+        """
+        Adds the sentence "count of cells are mines" to the knowledge and
+        queues it for inference, unless it is empty or already known.
+        """
+        if not cells:
+            return
+        sentence = (frozenset(cells), count)
+        if sentence in self.knowledge:
+            return
+        self.knowledge.add(sentence)
+        for cell in sentence[0]:
+            self.sentences_of.setdefault(cell, set()).add(sentence)
+        self.pending.append(sentence)
+
+    def remove_sentence(self, sentence):
+        self.knowledge.discard(sentence)
+        for cell in sentence[0]:
+            sentences = self.sentences_of[cell]
+            sentences.discard(sentence)
+            if not sentences:
+                del self.sentences_of[cell]
+
+    def propagate(self):
+        """
+        Draws inferences from pending sentences until none are left:
+        cells of sentences with no mines are safe, cells of sentences with
+        only mines are mines, and a sentence that is a subset of another
+        leaves the difference with the difference of their counts.
+        """
+        while self.pending:
+            sentence = self.pending.popleft()
+            # sentences rewritten since they were queued are queued again
+            if sentence not in self.knowledge:
+                continue
+            cells, count = sentence
+
+            # no mines in the sentence -> safe, as many cells as mines -> mines
+            if count == 0 or count == len(cells):
+                for cell in cells:
+                    self.assign(cell, count > 0)
+                continue
+
+            # only sentences sharing a cell can be subsets or supersets
+            related = set()
+            for cell in cells:
+                related.update(self.sentences_of[cell])
+            for other_cells, other_count in related:
+                if other_cells < cells:
+                    self.add_sentence(cells - other_cells, count - other_count)
+                elif cells < other_cells:
+                    self.add_sentence(other_cells - cells, other_count - count)
 
     def make_safe_move(self):
         """
@@ -288,12 +308,7 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        try:
-            for potential_move in iter(self.safes):
-                if potential_move not in self.moves_made:
-                    return potential_move
-        except:
-            return None
+        return next(iter(self.safe_moves), None)
 
     def make_random_move(self):
         """
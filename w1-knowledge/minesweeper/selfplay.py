@@ -0,0 +1,64 @@
+"""
+Headless Minesweeper AI benchmark
+"""
+
+import argparse
+import random
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def play(height, width, mines):
+    """
+    Plays one game with the AI the way runner.py does.
+    Returns (won, moves made, random moves made).
+    """
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width)
+    random_moves = 0
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                # every cell left is a known mine
+                return True, len(ai.moves_made), random_moves
+            random_moves += 1
+        if game.is_mine(move):
+            return False, len(ai.moves_made), random_moves
+        ai.add_knowledge(move, game.nearby_mines(move))
+        if len(ai.moves_made) == height * width - mines:
+            return True, len(ai.moves_made), random_moves
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-H", type=int, help="board height", default=100)
+    parser.add_argument("-W", type=int, help="board width", default=100)
+    parser.add_argument("-m", type=int, help="number of mines (default: 15%% of cells)", default=None)
+    parser.add_argument("-n", type=int, help="number of games", default=10)
+    parser.add_argument("--seed", type=int, help="random seed", default=0)
+    args = parser.parse_args()
+    mines = args.m if args.m is not None else args.H * args.W * 15 // 100
+
+    # Minesweeper places its mines with the random module
+    random.seed(args.seed)
+    wins = moves = random_moves = 0
+    start = time.perf_counter()
+    for _ in range(args.n):
+        won, made, guessed = play(args.H, args.W, mines)
+        wins += won
+        moves += made
+        random_moves += guessed
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.n} games on {args.H}x{args.W} with {mines} mines in {elapsed:.2f}s, "
+          f"{elapsed / args.n:.3f}s/game")
+    print(f"  won {wins} ({100 * wins / args.n:.1f}%)")
+    print(f"  {moves / args.n:.1f} moves/game, {random_moves / args.n:.1f} of them random, "
+          f"{1000000 * elapsed / max(moves, 1):.1f} us/move")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Parsing and binary serialization of logical sentences
+"""
+
+import os
+import re
+import struct
+import sys
+import time
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Text syntax is that of Sentence.formula(): ¬ binds tightest, then ∧, ∨,
+# => and <=> (the last two group to the right). Symbol names are any text
+# without operators or parentheses, e.g. "(A is a Knight) ∧ ¬B". Parsing a
+# formula() string gives back the same sentence, except that conjunctions
+# and disjunctions of fewer than two sentences are not written distinctly.
+
+OPERATOR = re.compile(r"(<=>|=>|[¬∧∨()])")
+
+# Binary files: header (magic, version, node count), the nodes of the
+# sentence DAG with children before parents, then the indices of the roots.
+# A node is an opcode followed by varints: the UTF-8 length and bytes of a
+# symbol name, or the number of children (for And and Or) and their indices.
+# Sub-sentences shared between sentences are stored once.
+MAGIC = b"LOGICKB\0"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+
+OPCODES = {Symbol: 0, Not: 1, And: 2, Or: 3, Implication: 4, Biconditional: 5}
+CLASSES = {opcode: cls for cls, opcode in OPCODES.items()}
+
+# text knowledge bases are cached in binary next to the file
+CACHE_SUFFIX = ".sentences"
+
+
+class Parser():
+    """Recursive descent parser over the tokens of one formula."""
+
+    def __init__(self, text):
+        self.text = text
+        # kinds[i] is the operator or "name" of token i (None at the end),
+        # names[i] the symbol name of a name token
+        self.kinds = []
+        self.names = []
+        # operators and the text between them, which is symbol names
+        for i, piece in enumerate(OPERATOR.split(text)):
+            if i % 2:
+                self.kinds.append(piece)
+                self.names.append(None)
+            elif piece.strip():
+                self.kinds.append("name")
+                self.names.append(piece.strip())
+        self.kinds.append(None)
+        self.index = 0
+
+    def peek(self):
+        return self.kinds[self.index]
+
+    def expect(self, token):
+        if self.peek() != token:
+            found = self.peek() or "end of formula"
+            raise ValueError(f"expected '{token}' but found '{found}' in '{self.text}'")
+        self.index += 1
+
+    def parse(self):
+        sentence = self.biconditional()
+        if self.peek() is not None:
+            raise ValueError(f"unexpected '{self.peek()}' in '{self.text}'")
+        return sentence
+
+    def biconditional(self):
+        left = self.implication()
+        if self.peek() == "<=>":
+            self.index += 1
+            return Biconditional(left, self.biconditional())
+        return left
+
+    def implication(self):
+        antecedent = self.disjunction()
+        if self.peek() == "=>":
+            self.index += 1
+            return Implication(antecedent, self.implication())
+        return antecedent
+
+    def disjunction(self):
+        disjuncts = [self.conjunction()]
+        while self.peek() == "∨":
+            self.index += 1
+            disjuncts.append(self.conjunction())
+        return disjuncts[0] if len(disjuncts) == 1 else Or(*disjuncts)
+
+    def conjunction(self):
+        conjuncts = [self.negation()]
+        while self.peek() == "∧":
+            self.index += 1
+            conjuncts.append(self.negation())
+        return conjuncts[0] if len(conjuncts) == 1 else And(*conjuncts)
+
+    def negation(self):
+        token = self.peek()
+        if token == "¬":
+            self.index += 1
+            return Not(self.negation())
+        if token == "(":
+            self.index += 1
+            sentence = self.biconditional()
+            self.expect(")")
+            return sentence
+        if token == "name":
+            name = self.names[self.index]
+            self.index += 1
+            return Symbol(name)
+        found = token or "end of formula"
+        raise ValueError(f"expected a sentence but found '{found}' in '{self.text}'")
+
+
+def parse(text):
+    """Returns the Sentence written in text."""
+    return Parser(text).parse()
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, position):
+    """Returns (value, position after it)."""
+    value = shift = 0
+    while True:
+        if position >= len(data):
+            raise ValueError("truncated sentence data")
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def children(sentence):
+    return () if isinstance(sentence, Symbol) else sentence.arguments()
+
+
+def dumps(sentences):
+    """Returns the binary serialization of a list of sentences."""
+    index = {}
+    body = bytearray()
+    roots = []
+    for root in sentences:
+        # post-order walk without recursion, so deep sentences are fine
+        stack = [root]
+        while stack:
+            sentence = stack[-1]
+            if sentence in index:
+                stack.pop()
+                continue
+            pending = [child for child in children(sentence) if child not in index]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            body.append(OPCODES[type(sentence)])
+            if isinstance(sentence, Symbol):
+                name = sentence.name.encode("utf-8")
+                write_varint(body, len(name))
+                body += name
+            else:
+                if isinstance(sentence, (And, Or)):
+                    write_varint(body, len(sentence.arguments()))
+                for child in sentence.arguments():
+                    write_varint(body, index[child])
+            index[sentence] = len(index)
+        roots.append(index[root])
+
+    write_varint(body, len(roots))
+    for root in roots:
+        write_varint(body, root)
+    return HEADER.pack(MAGIC, VERSION, len(index)) + bytes(body)
+
+
+def loads(data):
+    """Returns the list of sentences serialized by dumps()."""
+    if len(data) < HEADER.size:
+        raise ValueError("not a sentence file")
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a sentence file")
+    if version != VERSION:
+        raise ValueError(f"unsupported sentence file version {version}")
+
+    nodes = []
+    position = HEADER.size
+
+    def node(position):
+        i, position = read_varint(data, position)
+        if i >= len(nodes):
+            raise ValueError("corrupt sentence data")
+        return nodes[i], position
+
+    for _ in range(count):
+        if position >= len(data) or data[position] not in CLASSES:
+            raise ValueError("corrupt sentence data")
+        cls = CLASSES[data[position]]
+        position += 1
+        if cls is Symbol:
+            length, position = read_varint(data, position)
+            nodes.append(Symbol(bytes(data[position:position + length]).decode("utf-8")))
+            position += length
+            continue
+        if cls in (And, Or):
+            arity, position = read_varint(data, position)
+        else:
+            arity = 1 if cls is Not else 2
+        arguments = []
+        for _ in range(arity):
+            argument, position = node(position)
+            arguments.append(argument)
+        nodes.append(cls(*arguments))
+
+    roots, position = read_varint(data, position)
+    sentences = []
+    for _ in range(roots):
+        sentence, position = node(position)
+        sentences.append(sentence)
+    return sentences
+
+
+def write(path, sentences):
+    with open(path, "wb") as f:
+        f.write(dumps(sentences))
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def load(path, cache=True):
+    """
+    Reads a text knowledge base: one formula per line, blank lines and lines
+    starting with # are skipped. Returns the list of sentences.
+
+    With cache, the parsed sentences are kept in a binary file next to it
+    that is used instead as long as it is newer than the text.
+    """
+    cache_path = path + CACHE_SUFFIX
+    if cache:
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(path):
+                return read(cache_path)
+        except (OSError, ValueError):
+            pass
+
+    sentences = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                sentences.append(parse(line))
+            except ValueError as e:
+                raise ValueError(f"{path}, line {number}: {e}") from None
+
+    if cache:
+        try:
+            write(cache_path, sentences)
+        except OSError:
+            pass
+    return sentences
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python formulas.py knowledge.txt")
+    path = sys.argv[1]
+
+    start = time.perf_counter()
+    sentences = load(path, cache=False)
+    parsed = time.perf_counter() - start
+    write(path + CACHE_SUFFIX, sentences)
+
+    start = time.perf_counter()
+    read(path + CACHE_SUFFIX)
+    loaded = time.perf_counter() - start
+    symbols = frozenset().union(*[sentence.symbols() for sentence in sentences])
+    print(f"{len(sentences)} sentences over {len(symbols)} symbols: "
+          f"parsed in {parsed:.3f}s, cache read in {loaded:.3f}s, "
+          f"{os.path.getsize(path + CACHE_SUFFIX)} bytes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,93 @@
 import itertools
+import weakref
+from collections import Counter
 
 
 class Sentence():
+    """
+    Immutable, hash-consed logical sentence.
+
+    Constructing a sentence that is structurally equal to a live one returns
+    that same object, so equal sub-formulas share one node and equality is
+    identity. Each node caches its hash, symbol set and formula string.
+    """
+
+    __slots__ = ("_hash", "_symbols", "_formula", "__weakref__")
+
+    # (class, fields) -> the live sentence with those fields
+    _table = weakref.WeakValueDictionary()
+
+    @classmethod
+    def _intern(cls, fields, symbols):
+        """
+        Returns the interned cls node with fields (a tuple matching cls.fields),
+        creating it with the given symbol set if it doesn't exist.
+        """
+        key = (cls, fields)
+        node = Sentence._table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            for name, value in zip(cls.fields, fields):
+                object.__setattr__(node, name, value)
+            object.__setattr__(node, "_hash", hash((cls.kind, fields)))
+            object.__setattr__(node, "_symbols", symbols)
+            object.__setattr__(node, "_formula", None)
+            Sentence._table[key] = node
+        return node
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # rebuild through the constructor so unpickled sentences are interned too
+        return (type(self), self.arguments())
+
+    def arguments(self):
+        """Returns the constructor arguments of the sentence."""
+        return tuple(getattr(self, name) for name in self.fields)
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave symbols
+        unassigned: returns True or False if the assigned symbols decide
+        it, None (unknown) otherwise.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
-        return ""
+        if self._formula is None:
+            out = []
+            self.write_formula(out)
+            object.__setattr__(self, "_formula", "".join(out))
+        return self._formula
+
+    def write_formula(self, out):
+        """Appends the pieces of the formula string to the list out."""
+
+    def bare(self):
+        """Returns True if the formula needs no parentheses as an operand."""
+        return False
+
+    def write_operand(self, out):
+        """Appends the formula to out, parenthesized unless it is bare."""
+        if self.bare():
+            self.write_formula(out)
+        else:
+            out.append("(")
+            self.write_formula(out)
+            out.append(")")
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozenset of all symbols in the logical sentence."""
+        return self._symbols
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +117,12 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
+    kind = "symbol"
+    fields = ("name",)
 
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
-
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    def __new__(cls, name):
+        return cls._intern((name,), frozenset((name,)))
 
     def __repr__(self):
         return self.name
@@ -62,23 +133,25 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
-    def formula(self):
-        return self.name
+    def partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
 
-    def symbols(self):
-        return {self.name}
+    def write_formula(self, out):
+        out.append(self.name)
 
+    def bare(self):
+        return self.name.isalpha()
 
-class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+class Not(Sentence):
+    __slots__ = ("operand",)
+    kind = "not"
+    fields = ("operand",)
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        return cls._intern((operand,), operand.symbols())
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -86,26 +159,25 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
-    def formula(self):
-        return "¬" + Sentence.parenthesize(self.operand.formula())
+    def partial(self, model):
+        value = self.operand.partial(model)
+        return None if value is None else not value
 
-    def symbols(self):
-        return self.operand.symbols()
+    def write_formula(self, out):
+        out.append("¬")
+        self.operand.write_operand(out)
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+    kind = "and"
+    fields = ("conjuncts",)
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        symbols = frozenset().union(*[conjunct.symbols() for conjunct in conjuncts])
+        return cls._intern((conjuncts,), symbols)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -113,68 +185,93 @@ class And(Sentence):
         )
         return f"And({conjunctions})"
 
+    def arguments(self):
+        return self.conjuncts
+
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        """Returns a new conjunction with conjunct appended."""
+        return And(*self.conjuncts, conjunct)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
-    def formula(self):
+    def partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
+    def write_formula(self, out):
         if len(self.conjuncts) == 1:
-            return self.conjuncts[0].formula()
-        return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
-                           for conjunct in self.conjuncts])
+            self.conjuncts[0].write_formula(out)
+            return
+        for i, conjunct in enumerate(self.conjuncts):
+            if i:
+                out.append(" ∧ ")
+            conjunct.write_operand(out)
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def bare(self):
+        return not self.conjuncts or (len(self.conjuncts) == 1 and self.conjuncts[0].bare())
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+    kind = "or"
+    fields = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        symbols = frozenset().union(*[disjunct.symbols() for disjunct in disjuncts])
+        return cls._intern((disjuncts,), symbols)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
 
+    def arguments(self):
+        return self.disjuncts
+
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
-    def formula(self):
+    def partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
+    def write_formula(self, out):
         if len(self.disjuncts) == 1:
-            return self.disjuncts[0].formula()
-        return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
-                            for disjunct in self.disjuncts])
+            self.disjuncts[0].write_formula(out)
+            return
+        for i, disjunct in enumerate(self.disjuncts):
+            if i:
+                out.append(" ∨  ")
+            disjunct.write_operand(out)
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def bare(self):
+        return not self.disjuncts or (len(self.disjuncts) == 1 and self.disjuncts[0].bare())
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+    kind = "implies"
+    fields = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        symbols = antecedent.symbols() | consequent.symbols()
+        return cls._intern((antecedent, consequent), symbols)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -183,29 +280,32 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
-    def formula(self):
-        antecedent = Sentence.parenthesize(self.antecedent.formula())
-        consequent = Sentence.parenthesize(self.consequent.formula())
-        return f"{antecedent} => {consequent}"
+    def partial(self, model):
+        antecedent = self.antecedent.partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.partial(model)
+        if consequent is True:
+            return True
+        if antecedent is None or consequent is None:
+            return None
+        return False
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def write_formula(self, out):
+        self.antecedent.write_operand(out)
+        out.append(" => ")
+        self.consequent.write_operand(out)
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+    kind = "biconditional"
+    fields = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
-
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return cls._intern((left, right), left.symbols() | right.symbols())
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -216,13 +316,41 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
-    def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
-        return f"{left} <=> {right}"
+    def partial(self, model):
+        left = self.left.partial(model)
+        if left is None:
+            return None
+        right = self.right.partial(model)
+        if right is None:
+            return None
+        return left == right
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def write_formula(self, out):
+        self.left.write_operand(out)
+        out.append(" <=> ")
+        self.right.write_operand(out)
+
+
+# knowledge bases with more symbols than this are checked by the SAT solver;
+# below it the pruned enumeration of check_all is faster (on random knights
+# and knaves puzzles the two cross over at about 12 symbols)
+ENUMERATION_LIMIT = 12
+
+
+def symbol_counts(*sentences):
+    """Returns a Counter of how often each symbol occurs in sentences."""
+    counts = Counter()
+
+    def count(sentence):
+        if isinstance(sentence, Symbol):
+            counts[sentence.name] += 1
+        else:
+            for argument in sentence.arguments():
+                count(argument)
+
+    for sentence in sentences:
+        count(sentence)
+    return counts
 
 
 def model_check(knowledge, query):
@@ -231,33 +359,39 @@ def model_check(knowledge, query):
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
 
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
+        # If knowledge base is already false, every extension of model is fine
+        known = knowledge.partial(model)
+        if known is False:
             return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+        # If query is already true, entailment holds in every extension too
+        answer = query.partial(model)
+        if answer is True:
+            return True
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+        # If knowledge base is true and query false, the model refutes entailment
+        if known is True and answer is False:
+            return False
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+        # Otherwise assign the next symbol both ways (undone afterwards)
+        p = symbols[len(model)]
+        model[p] = True
+        entailed = check_all(knowledge, query, symbols, model)
+        if entailed:
+            model[p] = False
+            entailed = check_all(knowledge, query, symbols, model)
+        del model[p]
+        return entailed
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols() | query.symbols())
+
+    # Refute knowledge ∧ ¬query with the SAT solver if enumeration is too big
+    if len(symbols) > ENUMERATION_LIMIT:
+        import sat
+        return sat.entails(knowledge, query)
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    # Check that knowledge entails query, most frequent symbols first
+    counts = symbol_counts(knowledge, query)
+    order = sorted(symbols, key=lambda symbol: (-counts[symbol], symbol))
+    return check_all(knowledge, query, order, dict())
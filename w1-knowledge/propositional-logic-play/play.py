@@ -1,4 +1,6 @@
 from logic import *
+from sat import KnowledgeBase
+from counting import ModelCounter
 import termcolor
 
 # ---
@@ -22,17 +24,21 @@ knowledge_base = And(
 
 def what_is_true(knowledge_base):
     print('What we know for sure:')
+    known = KnowledgeBase(knowledge_base).backbone(symbols)
     for symbol in symbols:
-        if model_check(knowledge_base, symbol):
+        if known[symbol]:
             print(f"- {symbol}")
 
 def check_knowledge(knowledge_base):
     print('Knowledge base complete state:')
+    # one model count answers every symbol, with how likely it is
+    counter = ModelCounter(knowledge_base)
     for symbol in symbols:
-        if model_check(knowledge_base, symbol):
+        known = counter.status(symbol)
+        if known:
             termcolor.cprint(f"- {symbol}: YES", "green")
-        elif not model_check(knowledge_base, Not(symbol)):
-            print(f"- {symbol}: MAYBE")
+        elif known is None:
+            print(f"- {symbol}: MAYBE ({counter.probability(symbol):.0%} of models)")
 
 if __name__ == "__main__":
     print()
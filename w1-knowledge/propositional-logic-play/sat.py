@@ -0,0 +1,461 @@
+from logic import And, Biconditional, Implication, Not, Or, Sentence, Symbol
+
+
+class Encoder():
+    """
+    Tseitin encoding of Sentences into CNF clauses for a Solver.
+
+    Every symbol gets a variable, and every compound sub-sentence a fresh
+    variable that the added clauses make equivalent to it, so the CNF grows
+    linearly with the sentence. Literals are ints: v for variable v, -v for
+    its negation.
+    """
+
+    def __init__(self, solver):
+        self.solver = solver
+        # symbol name -> variable
+        self.variables = {}
+        # sentence -> literal equivalent to it
+        self.literals = {}
+        self.true = None
+
+    def variable(self, name):
+        """Returns the variable of a symbol name, creating it if needed."""
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_variable()
+        return self.variables[name]
+
+    def constant_true(self):
+        """Returns a literal fixed to true (used for empty conjunctions)."""
+        if self.true is None:
+            self.true = self.solver.new_variable()
+            self.solver.add_clause([self.true])
+        return self.true
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to sentence, adding its definition."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        add = self.solver.add_clause
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            if not parts:
+                return self.constant_true()
+            x = self.solver.new_variable()
+            for part in parts:
+                add([-x, part])
+            add([x] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            if not parts:
+                return -self.constant_true()
+            x = self.solver.new_variable()
+            for part in parts:
+                add([x, -part])
+            add([-x] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            x = self.solver.new_variable()
+            add([-x, -a, b])
+            add([x, a])
+            add([x, -b])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            x = self.solver.new_variable()
+            add([-x, -a, b])
+            add([-x, a, -b])
+            add([x, a, b])
+            add([x, -a, -b])
+        else:
+            raise TypeError(f"can't encode {sentence!r}")
+
+        self.literals[sentence] = x
+        return x
+
+    def assert_sentence(self, sentence):
+        """Adds clauses making sentence true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.assert_sentence(conjunct)
+        elif isinstance(sentence, Or):
+            self.solver.add_clause([self.literal(disjunct) for disjunct in sentence.disjuncts])
+        else:
+            self.solver.add_clause([self.literal(sentence)])
+
+
+class Solver():
+    """
+    CDCL SAT solver: unit propagation with two watched literals per clause,
+    first-UIP clause learning with non-chronological backjumping,
+    activity-based decisions with phase saving, and restarts.
+
+    Clauses can be added between calls to solve(), and solve() takes
+    assumption literals, so one Solver answers many related queries and
+    keeps its learned clauses for all of them.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.clauses = []
+        # literal -> indices of clauses watching it, visited when it becomes false
+        self.watches = {}
+        # per variable (index 0 unused)
+        self.values = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.increment = 1.0
+        self.inconsistent = False
+        self.conflicts = 0
+        self.decisions = 0
+
+    def new_variable(self):
+        self.n += 1
+        self.values.append(None)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        self.watches[self.n] = []
+        self.watches[-self.n] = []
+        return self.n
+
+    def value(self, literal):
+        """Returns True, False or None (unassigned) for a literal."""
+        value = self.values[abs(literal)]
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause (list of literals). Must be called between solves.
+        """
+        self.backtrack(0)
+        clause = []
+        for literal in literals:
+            if -literal in clause:
+                return
+            if literal not in clause and self.value(literal) is not False:
+                if self.value(literal) is True:
+                    return
+                clause.append(literal)
+
+        if not clause:
+            self.inconsistent = True
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.inconsistent = True
+        else:
+            self.attach(clause)
+
+    def attach(self, clause):
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses.
+        Returns the index of a conflicting clause, or None.
+        """
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false_literal]
+            kept = []
+            i = 0
+            while i < len(watching):
+                index = watching[i]
+                i += 1
+                clause = self.clauses[index]
+                # keep the false literal in position 1
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(index)
+                    continue
+
+                # look for a new literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watching[i:])
+                        self.watches[false_literal] = kept
+                        return index
+                    self.assign(clause[0], index)
+            self.watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derives the first-UIP clause of a conflict.
+        Returns (learned clause with the asserting literal first, backjump level).
+        """
+        level = len(self.trail_limits)
+        seen = set()
+        learned = [None]
+        pending = 0
+        literal = None
+        clause = self.clauses[conflict]
+        i = len(self.trail) - 1
+
+        while True:
+            for other in clause:
+                if other == literal:
+                    continue
+                variable = abs(other)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # next literal of the current level on the trail
+            while abs(self.trail[i]) not in seen:
+                i -= 1
+            literal = self.trail[i]
+            i -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # watch the literal of the highest remaining level second
+        highest = max(range(1, len(learned)), key=lambda k: self.levels[abs(learned[k])])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+
+    def backtrack(self, level):
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = literal > 0
+            self.values[variable] = None
+            self.reasons[variable] = None
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the highest activity, or None."""
+        best = None
+        for variable in range(1, self.n + 1):
+            if self.values[variable] is None and (
+                    best is None or self.activity[variable] > self.activity[best]):
+                best = variable
+        return best
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses and assumption literals are satisfiable,
+        leaving a satisfying assignment in model(), else False.
+        """
+        self.backtrack(0)
+        if self.inconsistent or self.propagate() is not None:
+            self.inconsistent = True
+            return False
+
+        assumptions = list(assumptions)
+        restart_limit = 100
+        conflicts_since_restart = 0
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts_since_restart += 1
+                if len(self.trail_limits) == 0:
+                    self.inconsistent = True
+                    return False
+                learned, level = self.analyze(conflict)
+                # backjumping below the assumptions means they are refuted
+                # at the level they were made, which the loop below catches
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.attach(learned))
+                self.increment *= 1.05
+                continue
+
+            if conflicts_since_restart >= restart_limit:
+                conflicts_since_restart = 0
+                restart_limit = int(restart_limit * 1.5)
+                self.backtrack(0)
+                continue
+
+            # assumptions are the first decisions, one level each
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value is False:
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value is None:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                self.saved_model = list(self.values)
+                return True
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self.assign(variable if self.phase[variable] else -variable, None)
+
+    def model(self):
+        """Returns the last satisfying assignment as a list indexed by variable."""
+        return self.saved_model
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query by refuting knowledge ∧ ¬query.
+    """
+    solver = Solver()
+    encoder = Encoder(solver)
+    encoder.assert_sentence(knowledge)
+    encoder.assert_sentence(Not(query))
+    return not solver.solve()
+
+
+class KnowledgeBase():
+    """
+    Knowledge base compiled once into a Solver.
+
+    Sentences can be added at any time with add(), and every query is a
+    solve under assumptions on the same solver, so clauses learned while
+    answering one query speed up the next ones.
+    """
+
+    def __init__(self, *sentences):
+        self.solver = Solver()
+        self.encoder = Encoder(self.solver)
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence known to be true."""
+        Sentence.validate(sentence)
+        self.encoder.assert_sentence(sentence)
+
+    def consistent(self):
+        """Returns True if some model makes every added sentence true."""
+        return self.solver.solve()
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        return not self.solver.solve([-self.encoder.literal(query)])
+
+    def status(self, query):
+        """
+        Returns True if query is entailed, False if its negation is,
+        None if neither is known.
+        """
+        if self.entails(query):
+            return True
+        if self.entails(Not(query)):
+            return False
+        return None
+
+    def models(self, symbols, limit=None):
+        """
+        Yields the distinct assignments (dicts symbol -> bool) to symbols
+        that extend to a model of the knowledge base, at most limit of them.
+        """
+        literals = {symbol: self.encoder.literal(symbol) for symbol in symbols}
+        # clauses blocking found assignments only hold while guard is assumed,
+        # and are switched off for good once enumeration ends
+        guard = self.solver.new_variable()
+        found = 0
+        try:
+            while (limit is None or found < limit) and self.solver.solve([guard]):
+                model = self.solver.model()
+                values = {symbol: model[abs(literal)] == (literal > 0)
+                          for symbol, literal in literals.items()}
+                found += 1
+                self.solver.add_clause([-guard] + [-literal if values[symbol] else literal
+                                                   for symbol, literal in literals.items()])
+                yield values
+        finally:
+            self.solver.add_clause([-guard])
+
+    def backbone(self, symbols):
+        """
+        Returns a dict symbol -> True, False or None (unknown) for what the
+        knowledge base says about every symbol.
+
+        Starts from one model and only tries to flip values not yet seen
+        flipped: each satisfying model found rules out many symbols at once,
+        so this usually takes far fewer solves than symbols.
+        """
+        symbols = list(symbols)
+        literals = {symbol: self.encoder.literal(symbol) for symbol in symbols}
+        if not self.solver.solve():
+            # everything follows from an inconsistent knowledge base
+            return {symbol: True for symbol in symbols}
+
+        model = self.solver.model()
+        candidates = {symbol: model[abs(literal)] == (literal > 0)
+                      for symbol, literal in literals.items()}
+        known = {}
+        for symbol in symbols:
+            if symbol not in candidates:
+                continue
+            value = candidates.pop(symbol)
+            literal = literals[symbol]
+            if not self.solver.solve([-literal if value else literal]):
+                known[symbol] = value
+                continue
+            known[symbol] = None
+            # the new model shows other candidates can flip as well
+            model = self.solver.model()
+            for other in list(candidates):
+                other_literal = literals[other]
+                if (model[abs(other_literal)] == (other_literal > 0)) != candidates[other]:
+                    del candidates[other]
+                    known[other] = None
+        return {symbol: known[symbol] for symbol in symbols}
@@ -0,0 +1,129 @@
+"""
+Vectorized truth tables of logical sentences
+"""
+
+import numpy as np
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Assignment a of n ordered symbols gives symbol i the value a >> i & 1.
+# A column holds one sentence's value under every assignment, packed into
+# uint64 words: bit b of word w is the value under assignment 64 * w + b.
+# Columns are built and evaluated CHUNK_WORDS words at a time.
+CHUNK_WORDS = 1 << 14
+
+ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+NONE = np.uint64(0)
+
+# columns of the first six symbols repeat the same word
+PATTERNS = [np.uint64(p) for p in (
+    0xAAAAAAAAAAAAAAAA,
+    0xCCCCCCCCCCCCCCCC,
+    0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00,
+    0xFFFF0000FFFF0000,
+    0xFFFFFFFF00000000,
+)]
+
+# number of set bits of every byte value
+BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+def ordered_symbols(*sentences):
+    """Returns the sorted names of all symbols in sentences."""
+    return sorted(frozenset().union(*[sentence.symbols() for sentence in sentences]))
+
+
+def symbol_column(i, words):
+    """Returns the column of the i-th symbol over the given word indices."""
+    if i < 6:
+        return np.full(len(words), PATTERNS[i], dtype=np.uint64)
+    return np.where((words >> (i - 6)) & 1, ALL, NONE)
+
+
+def evaluate(sentence, columns, size, memo):
+    """
+    Returns the column of sentence (size words) given the columns of its symbols.
+    Shared sub-sentences are evaluated once through memo.
+    """
+    if sentence in memo:
+        return memo[sentence]
+    if isinstance(sentence, Symbol):
+        column = columns[sentence.name]
+    elif isinstance(sentence, Not):
+        column = ~evaluate(sentence.operand, columns, size, memo)
+    elif isinstance(sentence, And):
+        column = np.full(size, ALL)
+        for conjunct in sentence.conjuncts:
+            column = column & evaluate(conjunct, columns, size, memo)
+    elif isinstance(sentence, Or):
+        column = np.full(size, NONE)
+        for disjunct in sentence.disjuncts:
+            column = column | evaluate(disjunct, columns, size, memo)
+    elif isinstance(sentence, Implication):
+        column = (~evaluate(sentence.antecedent, columns, size, memo)
+                  | evaluate(sentence.consequent, columns, size, memo))
+    elif isinstance(sentence, Biconditional):
+        column = ~(evaluate(sentence.left, columns, size, memo)
+                   ^ evaluate(sentence.right, columns, size, memo))
+    else:
+        raise TypeError(f"can't evaluate {sentence!r}")
+    memo[sentence] = column
+    return column
+
+
+def truth_table(sentences, symbols):
+    """
+    Yields (first assignment, columns of sentences) for every chunk of the
+    truth table over the ordered symbol names.
+    """
+    n = len(symbols)
+    total_words = max(1, (1 << n) >> 6)
+    # with fewer than 6 symbols only the low 2^n bits of the one word count
+    valid = ALL if n >= 6 else np.uint64((1 << (1 << n)) - 1)
+
+    for first in range(0, total_words, CHUNK_WORDS):
+        words = np.arange(first, min(first + CHUNK_WORDS, total_words), dtype=np.uint64)
+        columns = {name: symbol_column(i, words) for i, name in enumerate(symbols)}
+        memo = {}
+        yield 64 * first, [evaluate(sentence, columns, len(words), memo) & valid
+                           for sentence in sentences]
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
+    symbols = ordered_symbols(knowledge, query)
+    for _, (k, q) in truth_table([knowledge, query], symbols):
+        if (k & ~q).any():
+            return False
+    return True
+
+
+def count(column):
+    """Returns the number of set bits in a column."""
+    return int(BYTE_COUNTS[column.astype("<u8").view(np.uint8)].sum())
+
+
+def count_models(sentence, symbols=None):
+    """
+    Returns the number of assignments to symbols (by default the symbols
+    of sentence) that make sentence true.
+    """
+    if symbols is None:
+        symbols = ordered_symbols(sentence)
+    return sum(count(column) for _, (column,) in truth_table([sentence], list(symbols)))
+
+
+def satisfying_models(sentence, symbols=None):
+    """
+    Yields every model (dict symbol name -> bool) over symbols (by default
+    the symbols of sentence) that makes sentence true.
+    """
+    if symbols is None:
+        symbols = ordered_symbols(sentence)
+    symbols = list(symbols)
+    for start, (column,) in truth_table([sentence], symbols):
+        bits = np.unpackbits(column.astype("<u8").view(np.uint8), bitorder="little")
+        for assignment in np.flatnonzero(bits):
+            assignment = start + int(assignment)
+            yield {name: bool(assignment >> i & 1) for i, name in enumerate(symbols)}